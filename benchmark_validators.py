@@ -0,0 +1,74 @@
+import argparse
+import json
+import logging
+import os
+from glob import glob
+from timeit import timeit
+
+from scripts.validator import COMPILED_BACKEND, JSONSCHEMA_BACKEND, find_validation_error, get_stac_validator
+
+LOGGER = logging.getLogger(__name__)
+
+PRODUCT_SCHEMAS = {
+    "corine-land-cover-raster": "schema/products/clc.json",
+    "vegetation-phenology-and-productivity": "schema/products/vpp.json",
+    "river-and-lake-ice-extent-s2": "schema/products/rlie-s2.json",
+    "corine-land-cover-plus-raster": "schema/products/clcplus.json",
+    "imperviousness-built-up-10m": "schema/products/ibu10m.json",
+    "natura2000": "schema/products/n2k.json",
+    "urban-atlas-building-height": "schema/products/uabh.json",
+    "eu-hydro": "schema/products/eu-hydro.json",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare the validator backends on the sample STACs.")
+    parser.add_argument("--stac-dir", default="stacs", help="directory of the STAC documents to validate")
+    parser.add_argument("--repeat", type=int, default=200, help="number of times each document is validated")
+    return parser.parse_args()
+
+
+def load_documents(stac_dir: str) -> dict[str, list[dict]]:
+    documents = {product_id: [] for product_id in PRODUCT_SCHEMAS}
+    for path in glob(os.path.join(stac_dir, "**/*.json"), recursive=True):
+        with open(path, encoding="utf-8") as f:
+            stac_dict = json.load(f)
+        product_id = stac_dict["id"] if stac_dict["type"] == "Collection" else stac_dict.get("collection")
+        if product_id in documents:
+            documents[product_id].append(stac_dict)
+    return documents
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    documents = load_documents(args.stac_dir)
+    LOGGER.info("%-40s %9s %12s %12s %8s", "product", "documents", JSONSCHEMA_BACKEND, COMPILED_BACKEND, "speedup")
+    for product_id, product_schema in PRODUCT_SCHEMAS.items():
+        if not documents[product_id]:
+            continue
+        timings = []
+        for backend in (JSONSCHEMA_BACKEND, COMPILED_BACKEND):
+            validator = get_stac_validator(product_schema, backend=backend)
+            errors = [find_validation_error(validator, stac_dict) for stac_dict in documents[product_id]]
+            assert not any(errors), f"{product_id} sample is invalid with the {backend} backend"
+            timings.append(
+                timeit(
+                    lambda validator=validator, product_id=product_id: [
+                        validator.is_valid(stac_dict) for stac_dict in documents[product_id]
+                    ],
+                    number=args.repeat,
+                )
+            )
+        per_document = [timing / (args.repeat * len(documents[product_id])) * 1e6 for timing in timings]
+        LOGGER.info(
+            "%-40s %9d %10.1fus %10.1fus %7.1fx",
+            product_id,
+            len(documents[product_id]),
+            *per_document,
+            timings[0] / timings[1],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import logging
+import os
 
 from scripts.clc.collection import create_collection, populate_collection
+from scripts.journal import ProgressJournal
 
 LOGGER = logging.getLogger(__name__)
 
@@ -8,7 +10,8 @@ LOGGER = logging.getLogger(__name__)
 def main():
     logging.basicConfig(filename="create_clc_collection.log")
     collection = create_collection()
-    populate_collection(collection, data_root="../CLC_100m")
+    with ProgressJournal("create_clc_collection.journal") as journal:
+        populate_collection(collection, data_root="../CLC_100m", journal=journal, max_workers=os.cpu_count() or 1)
 
 
 if __name__ == "__main__":
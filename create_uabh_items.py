@@ -1,17 +1,42 @@
 import logging
+import os
+from contextlib import nullcontext
 from glob import glob
 
-from scripts.uabh.item import create_uabh_item, get_stac_validator
+from scripts.assembler import ItemSummaryLog
+from scripts.journal import ProgressJournal
+from scripts.uabh.constants import COLLECTION_ID, ITEM_SUMMARIES, STAC_DIR, WORKING_DIR
+from scripts.uabh.item import create_uabh_item
+from scripts.validator import SampledValidator, get_stac_validator
+from scripts.writer import TREE_FORMAT, create_writer, shard_by_year
 
 LOGGER = logging.getLogger(__name__)
 
+VALIDATE_EVERY = 1
+NUM_WRITERS = 4
+# "ndjson" streams the items to stac_tests/urban-atlas-building-height[-<year>]-<run>.ndjson[.gz] instead
+OUTPUT_FORMAT = TREE_FORMAT
+SHARD_BY_YEAR = False
+COMPRESSION = None
+
 
 def main():
     logging.basicConfig(filename="create_uabh_items.log")
-    validator = get_stac_validator("schema/products/uabh.json")
+    validator = SampledValidator(get_stac_validator("schema/products/uabh.json"), every=VALIDATE_EVERY)
     zip_list = glob("/Users/chung-xianghong/Downloads/uabh_samples/**/*.zip")
-    for zip_file in zip_list:
-        create_uabh_item(zip_file, validator)
+    writer = create_writer(
+        OUTPUT_FORMAT,
+        NUM_WRITERS,
+        output_dir=os.path.join(WORKING_DIR, STAC_DIR),
+        name=COLLECTION_ID,
+        shard_by=shard_by_year if SHARD_BY_YEAR else None,
+        compression=COMPRESSION,
+    )
+    # NDJSON items have no files for the collection to link
+    summary_log = ItemSummaryLog(ITEM_SUMMARIES) if OUTPUT_FORMAT == TREE_FORMAT else None
+    with ProgressJournal("create_uabh_items.journal") as journal, summary_log or nullcontext(), writer:
+        for zip_file in zip_list:
+            create_uabh_item(zip_file, validator, journal, writer, summary_log)
 
 
 if __name__ == "__main__":
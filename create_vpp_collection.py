@@ -1,17 +1,24 @@
 import logging
+import os
 from glob import glob
 
-from scripts.vpp.collection import create_vpp_collection, get_stac_validator
-from scripts.vpp.constants import COLLECTION_ID, STAC_DIR, WORKING_DIR
+from scripts.assembler import read_item_summaries
+from scripts.validator import get_stac_validator
+from scripts.vpp.collection import create_vpp_collection
+from scripts.vpp.constants import COLLECTION_ID, ITEM_SUMMARIES, STAC_DIR, WORKING_DIR
 
 LOGGER = logging.getLogger(__name__)
 
 
 def main():
     logging.basicConfig(filename="create_vpp_collection.log")
-    item_list = glob(f"{WORKING_DIR}/{STAC_DIR}/{COLLECTION_ID}/**/*.json")
+    if os.path.exists(ITEM_SUMMARIES):
+        # the summary records of the item generator spare listing and reading every item
+        item_list, item_summaries = [], read_item_summaries(ITEM_SUMMARIES)
+    else:
+        item_list, item_summaries = glob(f"{WORKING_DIR}/{STAC_DIR}/{COLLECTION_ID}/**/*.json"), None
     validator = get_stac_validator("schema/products/vpp.json")
-    create_vpp_collection(item_list, validator)
+    create_vpp_collection(item_list, validator, item_summaries)
 
 
 if __name__ == "__main__":
@@ -1,33 +1,114 @@
-import itertools as it
+import argparse
+import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import os
+from contextlib import nullcontext
 
-from tqdm import tqdm
-
-from scripts.vpp.constants import AWS_SESSION, BUCKET
-from scripts.vpp.item import create_page_iterator, create_product_list, create_vpp_item, get_stac_validator
+from scripts.assembler import ItemSummaryLog
+from scripts.journal import ProgressJournal
+from scripts.validator import COMPILED_BACKEND, JSONSCHEMA_BACKEND, SampledValidator, get_stac_validator
+from scripts.vpp.client_pool import S3ClientPool
+from scripts.vpp.constants import BUCKET, COLLECTION_ID, ITEM_SUMMARIES, STAC_DIR, WORKING_DIR, get_aws_session
+from scripts.vpp.inventory import read_inventory
+from scripts.vpp.item import create_product_list, group_tile_objects, shard_by_tile
+from scripts.vpp.pipeline import PipelineConfig, run_pipeline
+from scripts.vpp.tile_grid import TileGridCache
+from scripts.writer import NDJSON_FORMAT, TREE_FORMAT, create_writer, shard_by_year
 
 LOGGER = logging.getLogger(__name__)
 
+NUM_WORKERS = 100
+NUM_WRITERS = 4
+SHARD_FUNCTIONS = {"year": shard_by_year, "tile": shard_by_tile}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create STAC items for the VPP product.")
+    parser.add_argument(
+        "--inventory",
+        help=(
+            "manifest.json of an S3 Inventory report (local path or s3:// URI) to read the keys from instead of"
+            " listing the bucket"
+        ),
+    )
+    parser.add_argument(
+        "--journal",
+        default="create_vpp_items.journal",
+        help="progress journal used to skip tiles that are already done when the run is resumed",
+    )
+    parser.add_argument(
+        "--tile-grid",
+        default="vpp_tile_grid.sqlite",
+        help="cache of the bounds, shape and footprint of the tiles, read from S3 only for the first product of a tile",
+    )
+    parser.add_argument(
+        "--validate-every",
+        type=int,
+        default=1,
+        help="validate only one in this many items, for reruns over tiles that are known to produce valid items",
+    )
+    parser.add_argument(
+        "--validator-backend",
+        choices=(JSONSCHEMA_BACKEND, COMPILED_BACKEND),
+        default=JSONSCHEMA_BACKEND,
+        help="validate items with jsonschema or with code generated from the product schema (needs fastjsonschema)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=(TREE_FORMAT, NDJSON_FORMAT),
+        default=TREE_FORMAT,
+        help="save one JSON file per item in the STAC tree, or stream the items to NDJSON files in the STAC directory",
+    )
+    parser.add_argument("--shard-by", choices=tuple(SHARD_FUNCTIONS), help="split the NDJSON output by year or tile")
+    parser.add_argument("--compression", choices=("gzip", "zstd"), help="compression of the NDJSON output")
+    return parser.parse_args()
+
 
 def main():
+    args = parse_args()
     logging.basicConfig(filename="create_vpp_items.log")
-    validator = get_stac_validator("schema/products/vpp.json")
+    validator = SampledValidator(
+        get_stac_validator("schema/products/vpp.json", backend=args.validator_backend), every=args.validate_every
+    )
     product_list = create_product_list(2017, 2023)
-
-    for product in product_list:
-        page_iterator = create_page_iterator(AWS_SESSION, BUCKET, product)
-        for page in page_iterator:
-            tiles = [prefix["Prefix"] for prefix in page["CommonPrefixes"]]
-            with ThreadPoolExecutor(max_workers=100) as executor:
-                list(
-                    tqdm(
-                        executor.map(
-                            create_vpp_item, it.repeat(AWS_SESSION), it.repeat(BUCKET), it.repeat(validator), tiles
-                        ),
-                        total=len(tiles),
-                    )
-                )
+    aws_session = get_aws_session()
+    client_pool = S3ClientPool(aws_session, size=NUM_WORKERS + 1)
+    tiles = None
+    if args.inventory:
+        tiles = group_tile_objects(read_inventory(args.inventory, aws_session.client("s3")), product_list)
+    writer = create_writer(
+        args.output_format,
+        NUM_WRITERS,
+        output_dir=os.path.join(WORKING_DIR, STAC_DIR),
+        name=COLLECTION_ID,
+        shard_by=SHARD_FUNCTIONS.get(args.shard_by),
+        compression=args.compression,
+    )
+    # NDJSON items have no files for the collection to link
+    summary_log = ItemSummaryLog(ITEM_SUMMARIES) if args.output_format == TREE_FORMAT else None
+    with (
+        ProgressJournal(args.journal) as journal,
+        TileGridCache(args.tile_grid) as tile_grid,
+        summary_log or nullcontext(),
+        writer,
+    ):
+        asyncio.run(
+            run_pipeline(
+                client_pool,
+                BUCKET,
+                validator,
+                product_list,
+                PipelineConfig(
+                    num_workers=NUM_WORKERS,
+                    num_writers=NUM_WRITERS,
+                    tiles=tiles,
+                    journal=journal,
+                    writer=writer,
+                    summary_log=summary_log,
+                    tile_grid=tile_grid,
+                ),
+            )
+        )
 
 
 if __name__ == "__main__":
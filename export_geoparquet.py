@@ -0,0 +1,27 @@
+import argparse
+import logging
+
+from scripts.geoparquet import ROW_GROUP_SIZE, export_geoparquet
+
+LOGGER = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export generated STAC items to GeoParquet.")
+    parser.add_argument(
+        "sources", nargs="+", help="STAC directories or NDJSON files (.ndjson, .ndjson.gz, .ndjson.zst)"
+    )
+    parser.add_argument("output", help="GeoParquet file to write")
+    parser.add_argument("--row-group-size", type=int, default=ROW_GROUP_SIZE, help="number of items per row group")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(filename="export_geoparquet.log", level=logging.INFO)
+    count = export_geoparquet(args.sources, args.output, args.row_group_size)
+    LOGGER.info("Exported %d items to %s", count, args.output)
+
+
+if __name__ == "__main__":
+    main()
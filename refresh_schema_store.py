@@ -0,0 +1,62 @@
+import argparse
+import json
+import logging
+import os
+from collections.abc import Iterator
+from urllib.parse import urldefrag, urljoin
+from urllib.request import urlopen
+
+from scripts.schema_store import SCHEMA_STORE_DIR, STORE_SCHEMA_URIS, get_schema_path
+
+LOGGER = logging.getLogger(__name__)
+
+# meta-schemas are bundled with jsonschema
+SKIPPED_HOSTS = ("http://json-schema.org/", "https://json-schema.org/")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Download the STAC schemas used for validation into the store.")
+    parser.add_argument("--store-dir", default=SCHEMA_STORE_DIR, help="directory of the schema store")
+    return parser.parse_args()
+
+
+def iter_refs(schema: dict | list) -> Iterator[str]:
+    if isinstance(schema, dict):
+        if isinstance(schema.get("$ref"), str):
+            yield schema["$ref"]
+        values = schema.values()
+    else:
+        values = schema
+    for value in values:
+        if isinstance(value, dict | list):
+            yield from iter_refs(value)
+
+
+def refresh_schema_store(store_dir: str) -> None:
+    pending = list(STORE_SCHEMA_URIS)
+    seen = set(pending)
+    while pending:
+        schema_uri = pending.pop()
+        with urlopen(schema_uri, timeout=30) as response:
+            content = response.read()
+        schema_path = get_schema_path(schema_uri, store_dir)
+        os.makedirs(os.path.dirname(schema_path), exist_ok=True)
+        with open(f"{schema_path}.tmp", "wb") as f:
+            f.write(content)
+        os.replace(f"{schema_path}.tmp", schema_path)
+        LOGGER.info("Stored %s", schema_uri)
+        for ref in iter_refs(json.loads(content)):
+            ref_uri = urldefrag(urljoin(schema_uri, ref)).url
+            if ref_uri and ref_uri not in seen and not ref_uri.startswith(SKIPPED_HOSTS):
+                seen.add(ref_uri)
+                pending.append(ref_uri)
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    refresh_schema_store(args.store_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+import pystac
+
+from .codec import dumps, load, loads
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_proj_epsg(item: dict) -> int | None:
+    if "proj:epsg" in item["properties"]:
+        return item["properties"]["proj:epsg"]
+    for asset in item.get("assets", {}).values():
+        if "proj:epsg" in asset:
+            return asset["proj:epsg"]
+    return None
+
+
+def summarize_item(item: dict, href: str) -> dict:
+    properties = item["properties"]
+    return {
+        "id": item["id"],
+        "href": href,
+        "bbox": item["bbox"],
+        "start_datetime": properties.get("start_datetime") or properties["datetime"],
+        "end_datetime": properties.get("end_datetime") or properties["datetime"],
+        "epsg": get_proj_epsg(item),
+        "assets": sorted(item.get("assets", {})),
+    }
+
+
+# JSON lines of the summary records of the items, appended as they are saved. The latest record of an item wins.
+class ItemSummaryLog:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")  # noqa: SIM115
+        self._lock = threading.Lock()
+
+    def record(self, item: pystac.Item) -> None:
+        line = dumps(summarize_item(item.to_dict(transform_hrefs=False), item.get_self_href())).decode("utf-8")
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> ItemSummaryLog:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+# skips the records of deleted items, and a last line cut short by an interrupted run
+def read_item_summaries(path: str) -> list[dict]:
+    records = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip() and line.endswith("\n"):
+                record = loads(line)
+                records[record["id"]] = record
+    existing = [record for record in records.values() if os.path.exists(record["href"])]
+    if len(existing) < len(records):
+        LOGGER.warning("Skipped the summary records of %d deleted items.", len(records) - len(existing))
+    return sorted(existing, key=lambda record: record["href"])
+
+
+# extent, EPSG codes and asset keys of items, updated one summary record at a time
+class ItemFold:
+    def __init__(self):
+        self.count = 0
+        self.bbox: list[float] | None = None
+        self.start_datetime: datetime | None = None
+        self.end_datetime: datetime | None = None
+        self.epsg: set[int] = set()
+        self.assets: set[str] = set()
+
+    def add(self, record: dict) -> None:
+        self.count += 1
+        bbox = record["bbox"]
+        xmin, ymin, xmax, ymax = bbox if len(bbox) == 4 else [bbox[i] for i in (0, 1, 3, 4)]
+        if self.bbox is None:
+            self.bbox = [xmin, ymin, xmax, ymax]
+        else:
+            self.bbox = [
+                min(self.bbox[0], xmin),
+                min(self.bbox[1], ymin),
+                max(self.bbox[2], xmax),
+                max(self.bbox[3], ymax),
+            ]
+        start = datetime.fromisoformat(record["start_datetime"])
+        end = datetime.fromisoformat(record["end_datetime"])
+        self.start_datetime = start if self.start_datetime is None else min(self.start_datetime, start)
+        self.end_datetime = end if self.end_datetime is None else max(self.end_datetime, end)
+        if record["epsg"] is not None:
+            self.epsg.add(record["epsg"])
+        self.assets.update(record["assets"])
+
+    def check(self, extent: pystac.Extent) -> list[str]:
+        if self.count == 0:
+            return []
+        problems = []
+        xmin, ymin, xmax, ymax = extent.spatial.bboxes[0][:4]
+        if self.bbox[0] < xmin or self.bbox[1] < ymin or self.bbox[2] > xmax or self.bbox[3] > ymax:
+            problems.append(f"items bbox {self.bbox} exceeds the collection bbox {extent.spatial.bboxes[0]}")
+        start, end = extent.temporal.intervals[0]
+        if (start is not None and to_naive_utc(self.start_datetime) < to_naive_utc(start)) or (
+            end is not None and to_naive_utc(self.end_datetime) > to_naive_utc(end)
+        ):
+            problems.append(
+                f"items interval {self.start_datetime.isoformat()}/{self.end_datetime.isoformat()} exceeds the"
+                " collection interval"
+            )
+        return problems
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is None else value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def create_item_link(record: dict) -> pystac.Link:
+    return pystac.Link(
+        rel=pystac.RelType.ITEM, target=record["href"], media_type=pystac.MediaType.JSON, title=record["id"]
+    )
+
+
+def link_item_summaries(records: Iterable[dict]) -> tuple[list[pystac.Link], ItemFold]:
+    links, fold = [], ItemFold()
+    for record in records:
+        fold.add(record)
+        links.append(create_item_link(record))
+    return links, fold
+
+
+# reads the items one at a time, unlike add_item, so that a collection can link any number of them
+def link_items(item_paths: Iterable[str]) -> tuple[list[pystac.Link], ItemFold]:
+    return link_item_summaries(summarize_item(load(item_path), item_path) for item_path in item_paths)
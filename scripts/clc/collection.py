@@ -1,19 +1,20 @@
-import json
 import logging
 import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import UTC, datetime
+from functools import partial
 
 import pystac
 import pystac.item
 import pystac.link
-
-# Taken 'as is' from other scripts
-from jsonschema import Draft7Validator
-from jsonschema.exceptions import best_match
 from pystac.extensions.item_assets import AssetDefinition, ItemAssetsExtension
 from pystac.extensions.projection import ProjectionExtension
-from referencing import Registry, Resource
 
+from ..journal import ProgressJournal
+from ..links import set_item_self_href
+from ..validator import find_validation_error, get_stac_validator
+from ..writer import BackgroundWriter, ItemWriter, write_stac_object
 from .constants import (
     CLMS_LICENSE,
     COLLECTION_DESCRIPTION,
@@ -30,21 +31,11 @@ from .constants import (
     STAC_DIR,
     WORKING_DIR,
 )
-from .item import create_item, deconstruct_clc_name, get_img_paths
+from .item import create_item, deconstruct_clc_name, get_img_paths, index_asset_files
 
 LOGGER = logging.getLogger(__name__)
 
 
-# Taken 'as is' from other scripts
-def get_stac_validator(product_schema: str) -> Draft7Validator:
-    with open(product_schema, encoding="utf-8") as f:
-        schema = json.load(f)
-    registry = Registry().with_resources(
-        [("http://example.com/schema.json", Resource.from_contents(schema))],
-    )
-    return Draft7Validator({"$ref": "http://example.com/schema.json"}, registry=registry)
-
-
 def proj_epsg_from_item_asset(item: pystac.Item) -> int:
     for asset_key in item.assets:
         asset = item.assets[asset_key].to_dict()
@@ -124,36 +115,115 @@ def create_collection() -> pystac.Collection:
     collection.set_root(catalog)
     collection.set_parent(catalog)
 
-    collection.save_object()
+    write_stac_object(collection)
 
     return collection
 
 
-def populate_collection(collection: pystac.Collection, data_root: str) -> pystac.Collection:
-    img_paths = get_img_paths(data_root)
+def get_item_href(img_path: str) -> str:
+    clc_name_elements = deconstruct_clc_name(img_path)
+    item_id = clc_name_elements["id"]
+    dom_code = clc_name_elements.get("DOM_code")
+    return os.path.join(
+        WORKING_DIR, f"{STAC_DIR}/{COLLECTION_ID}/{item_id.removesuffix(f'_FR_{dom_code}')}/{item_id}.json"
+    )
 
-    proj_epsg = []
-    for img_path in img_paths:
-        item = create_item(img_path, data_root)
-        collection.add_item(item)
 
-        item_epsg = proj_epsg_from_item_asset(item)
-        proj_epsg.append(item_epsg)
+# runs in a worker process in parallel mode
+def build_item(img_path: str, data_root: str, file_index: dict) -> tuple[pystac.Item, str | None]:
+    validator = get_stac_validator("schema/products/clc.json")
+    item = create_item(img_path, data_root, file_index)
+    set_item_self_href(item, get_item_href(img_path))
+    error_msg = find_validation_error(validator, item.to_dict())
+    return item, None if error_msg is None else f"Failed to create {item.id} item. Reason: {error_msg}."
+
+
+# data folder and asset file index of a worker process, sent once when it starts rather than with every image
+WORKER_STATE: dict = {}
 
-        dom_code = deconstruct_clc_name(img_path).get("DOM_code")
-        href = os.path.join(
-            WORKING_DIR, f"{STAC_DIR}/{COLLECTION_ID}/{item.id.removesuffix(f'_FR_{dom_code}')}/{item.id}.json"
-        )
-        item.set_self_href(href)
 
-        validator = get_stac_validator("schema/products/clc.json")
-        error_msg = best_match(validator.iter_errors(item.to_dict()))
-        try:
-            assert error_msg is None, f"Failed to create {item.id} item. Reason: {error_msg}."
-        except AssertionError as error:
-            LOGGER.error(error)
+def init_worker(data_root: str, file_index: dict) -> None:
+    WORKER_STATE.update(data_root=data_root, file_index=file_index)
 
-        item.save_object()
+
+def build_worker_item(img_path: str) -> tuple[pystac.Item, str | None]:
+    return build_item(img_path, WORKER_STATE["data_root"], WORKER_STATE["file_index"])
+
+
+def record_saved(
+    future: Future, img_path: str, last_modified: datetime, journal: ProgressJournal | None, error_msg: str | None
+) -> None:
+    if (error := future.exception()) is not None:
+        LOGGER.error("Failed to save %s item. Reason: %s.", img_path, error)
+        if journal is not None:
+            journal.mark_failed(img_path, str(error), last_modified=last_modified)
+    elif journal is not None and error_msg is None:
+        journal.mark_done(img_path, last_modified=last_modified)
+
+
+# with max_workers above 1, items are built in worker processes and added to the collection here, in image order
+def populate_collection(
+    collection: pystac.Collection,
+    data_root: str,
+    journal: ProgressJournal | None = None,
+    max_workers: int = 1,
+    num_writers: int = 4,
+    writer: BackgroundWriter | None = None,
+) -> pystac.Collection:
+    img_paths = get_img_paths(data_root)
+    file_index = index_asset_files(data_root)
+    validator = get_stac_validator("schema/products/clc.json")
+
+    # items saved by a previous run from the same image are read back instead of being created again
+    last_modified = {img_path: datetime.fromtimestamp(os.path.getmtime(img_path), tz=UTC) for img_path in img_paths}
+    resumed = {
+        img_path
+        for img_path in img_paths
+        if journal is not None and journal.is_done(img_path, last_modified=last_modified[img_path])
+    }
+    pending = [img_path for img_path in img_paths if img_path not in resumed]
+
+    proj_epsg = []
+    executor = (
+        ProcessPoolExecutor(max_workers, initializer=init_worker, initargs=(data_root, file_index))
+        if max_workers > 1
+        else None
+    )
+    with nullcontext(writer) if writer else ItemWriter(num_writers) as writer, executor or nullcontext():
+        if executor is None:
+            results = (build_item(img_path, data_root, file_index) for img_path in pending)
+        else:
+            results = executor.map(build_worker_item, pending)
+
+        for img_path in img_paths:
+            if img_path in resumed:
+                item, error_msg = pystac.Item.from_file(get_item_href(img_path)), None
+            else:
+                item, error_msg = next(results)
+            collection.add_item(item)
+
+            item_epsg = proj_epsg_from_item_asset(item)
+            proj_epsg.append(item_epsg)
+
+            item.set_self_href(get_item_href(img_path))
+            if img_path in resumed:
+                continue
+
+            if error_msg is not None:
+                LOGGER.error(error_msg)
+                if journal is not None:
+                    journal.mark_failed(img_path, error_msg, last_modified=last_modified[img_path])
+
+            writer.submit(
+                item,
+                partial(
+                    record_saved,
+                    img_path=img_path,
+                    last_modified=last_modified[img_path],
+                    journal=journal,
+                    error_msg=error_msg,
+                ),
+            )
 
     asset_files = get_collection_asset_files(data_root)
 
@@ -167,11 +237,11 @@ def populate_collection(collection: pystac.Collection, data_root: str) -> pystac
     collection.summaries = pystac.Summaries({"proj:epsg": list(set(proj_epsg))})
 
     try:
-        error_msg = best_match(validator.iter_errors(collection.to_dict()))
+        error_msg = find_validation_error(validator, collection.to_dict())
         assert error_msg is None, f"Failed to create {collection.id} collection. Reason: {error_msg}."
     except AssertionError as error:
         LOGGER.error(error)
 
-    collection.save_object()
+    write_stac_object(collection)
 
     return collection
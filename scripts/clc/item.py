@@ -3,6 +3,7 @@ import os
 import re
 from datetime import UTC, datetime
 
+import numpy as np
 import pystac
 import pystac.item
 import pystac.link
@@ -11,21 +12,23 @@ import rasterio.warp
 from pystac.extensions.projection import ProjectionExtension
 from shapely.geometry import box, mapping
 
+from ..links import create_item_links
 from .constants import (
     CLC_PROVIDER,
     CLMS_LICENSE,
     COLLECTION_ID,
+    COLLECTION_TITLE,
     DOM_MAP,
     ITEM_DESCRIPTION,
     ITEM_MEDIA_TYPE_MAP,
     ITEM_ROLES_MAP,
     ITEM_TITLE_MAP,
-    STAC_DIR,
-    WORKING_DIR,
 )
 
 LOGGER = logging.getLogger(__name__)
 
+CAMPAIGN_PATTERN = re.compile("u[0-9]{4}_(?:clc|cha)[0-9]{4}_v[0-9]{4}")
+
 
 def deconstruct_clc_name(filename: str) -> dict[str]:
     filename_split = {"dirname": os.path.dirname(filename), "basename": os.path.basename(filename)}
@@ -55,9 +58,9 @@ def create_item_asset(asset_file: str, dom_code: str) -> pystac.Asset:
 
     suffix = filename_elements["suffix"].replace(".", "_")
 
-    if id.startswith("readme"):
+    if filename_elements["id"].startswith("readme"):
         key = "readme_" + suffix
-    elif id.endswith("QGIS"):
+    elif filename_elements["id"].endswith("QGIS"):
         key = "legend_" + suffix
     else:
         key = suffix
@@ -84,35 +87,63 @@ def get_img_paths(data_root: str) -> list[str]:
     return img_paths
 
 
-def get_item_asset_files(data_root: str, img_path: str) -> list[str]:
+def get_file_lookup_keys(file: str) -> list[str]:
+    keys = []
+    if "." in file:
+        keys.append(f"id:{file.split('.')[0]}")
+    if file.startswith("readme_") and file.endswith(".txt"):
+        keys.append(f"id:{file.removeprefix('readme_').removesuffix('.txt')}")
+    if file.endswith(".tif.lyr"):
+        keys.append("lyr")
+    if file.endswith("QGIS.txt"):
+        keys.append("qgis")
+    return keys
+
+
+# files by campaign folder and lookup key (id:<clc_id>, lyr or qgis), with their position in the walk to keep its order
+def index_asset_files(data_root: str) -> dict[str, dict[str, dict[int, str]]]:
+    file_index = {}
+    position = 0
+    for root, _, files in os.walk(data_root):
+        campaigns = set(CAMPAIGN_PATTERN.findall(root))
+        for file in files:
+            position += 1
+            for campaign in campaigns:
+                for key in get_file_lookup_keys(file):
+                    file_index.setdefault(campaign, {}).setdefault(key, {})[position] = os.path.join(root, file)
+    return file_index
+
+
+def get_item_asset_files(
+    data_root: str, img_path: str, file_index: dict[str, dict[str, dict[int, str]]] | None = None
+) -> list[str]:
     clc_name_elements = deconstruct_clc_name(img_path)
     clc_id = clc_name_elements["id"]
     dom_code = clc_name_elements["DOM_code"]
 
+    if file_index is None:
+        file_index = index_asset_files(data_root)
+    campaign = "U{update_campaign}_{theme}{reference_year}_V{release_year}".format(**clc_name_elements).lower()
+    campaign_files = file_index.get(campaign, {})
+
+    candidates = campaign_files.get(f"id:{clc_id}", {}) | campaign_files.get("qgis", {})
+    candidates |= {
+        position: path
+        for position, path in campaign_files.get("lyr", {}).items()
+        if path.endswith(f"{dom_code}.tif.lyr")
+    }
+
     asset_files = []
+    for position in sorted(candidates):
+        root = os.path.dirname(candidates[position])
 
-    for root, _, files in os.walk(data_root):
         if not dom_code and "French_DOMs" in root:
             continue
 
         if dom_code and "Legend" in root and "French_DOMs" not in root:
             continue
 
-        if "U{update_campaign}_{theme}{reference_year}_V{release_year}".format(**clc_name_elements).lower() not in root:
-            continue
-
-        for file in files:
-            if (
-                file.startswith(f"{clc_id}.")
-                or file.endswith(
-                    (
-                        f"{dom_code}.tif.lyr",
-                        "QGIS.txt",
-                    )
-                )
-                or file == f"readme_{clc_id}.txt"
-            ):
-                asset_files.append(os.path.join(root, file))
+        asset_files.append(candidates[position])
 
     return asset_files
 
@@ -121,27 +152,35 @@ def project_bbox(src: rio.io.DatasetReader, dst_crs: rio.CRS) -> tuple[float]:
     return rio.warp.transform_bounds(src.crs, dst_crs, *src.bounds)
 
 
+# GDAL warps straight from the dataset in chunks, so only the coarse reprojected grid is held in memory
 def project_data_window_bbox(
     src: rio.io.DatasetReader, dst_crs: rio.CRS, dst_resolution: tuple = (0.25, 0.25)
 ) -> tuple[float]:
-    data, transform = rio.warp.reproject(
-        source=src.read(),
-        src_transform=src.transform,
-        src_crs=src.crs,
+    transform, width, height = rio.warp.calculate_default_transform(
+        src.crs, dst_crs, src.width, src.height, *src.bounds, resolution=dst_resolution
+    )
+    if src.nodata is None:
+        return rio.windows.bounds(rio.windows.Window(0, 0, width, height), transform=transform)
+
+    data = np.full((src.count, height, width), src.nodata, dtype=src.dtypes[0])
+    rio.warp.reproject(
+        source=rio.band(src, list(src.indexes)),
+        destination=data,
+        dst_transform=transform,
         dst_crs=dst_crs,
         dst_nodata=src.nodata,
-        dst_resolution=dst_resolution,
         resampling=rio.warp.Resampling.max,
     )
-
     data_window = rio.windows.get_data_window(data, nodata=src.nodata)
     return rio.windows.bounds(data_window, transform=transform)
 
 
-def create_item(img_path: str, data_root: str) -> pystac.Item:
+def create_item(
+    img_path: str, data_root: str, file_index: dict[str, dict[str, dict[int, str]]] | None = None
+) -> pystac.Item:
     clc_name_elements = deconstruct_clc_name(img_path)
 
-    asset_files = get_item_asset_files(data_root, img_path)
+    asset_files = get_item_asset_files(data_root, img_path, file_index)
     asset_files = [f for f in asset_files if not f.endswith("aux")]
     year = clc_name_elements.get("reference_year")
     props = {
@@ -170,7 +209,7 @@ def create_item(img_path: str, data_root: str) -> pystac.Item:
 
     for asset_file in asset_files:
         try:
-            key, asset = create_item_asset(asset_file, DOM_code=clc_name_elements.get("DOM_code"))
+            key, asset = create_item_asset(asset_file, dom_code=clc_name_elements.get("DOM_code"))
             item.add_asset(
                 key=key,
                 asset=asset,
@@ -198,24 +237,7 @@ def create_item(img_path: str, data_root: str) -> pystac.Item:
         transform=[*list(img.transform), 0.0, 0.0, 1.0],
     )
 
-    clms_catalog_link = pystac.link.Link(
-        rel=pystac.RelType.ROOT,
-        target=pystac.STACObject.from_file(os.path.join(WORKING_DIR, f"{STAC_DIR}/clms_catalog.json")),
-    )
-    collection_link = pystac.link.Link(
-        rel=pystac.RelType.COLLECTION,
-        target=pystac.STACObject.from_file(
-            os.path.join(WORKING_DIR, f"{STAC_DIR}/{COLLECTION_ID}/{COLLECTION_ID}.json")
-        ),
-    )
-    item_parent_link = pystac.link.Link(
-        rel=pystac.RelType.PARENT,
-        target=pystac.STACObject.from_file(
-            os.path.join(WORKING_DIR, f"{STAC_DIR}/{COLLECTION_ID}/{COLLECTION_ID}.json")
-        ),
-    )
-
-    links = [CLMS_LICENSE, clms_catalog_link, item_parent_link, collection_link]
-    item.add_links(links)
+    # appended without an owner, so that serializing the item does not resolve the root catalog
+    item.links.extend([CLMS_LICENSE, *create_item_links(COLLECTION_ID, COLLECTION_TITLE)])
 
     return item
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+
+from pystac.stac_io import DefaultStacIO
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_BACKEND = "orjson"
+STDLIB_BACKEND = "json"
+# STAC_JSON_BACKEND=json pins the standard library, e.g. to compare the output of machines with and without orjson
+BACKEND = os.environ.get("STAC_JSON_BACKEND", ORJSON_BACKEND if orjson is not None else STDLIB_BACKEND)
+
+if BACKEND not in (ORJSON_BACKEND, STDLIB_BACKEND):
+    raise ValueError(f"Unknown JSON backend {BACKEND}.")
+if BACKEND == ORJSON_BACKEND and orjson is None:
+    raise ImportError("The orjson JSON backend requires orjson.")
+
+
+# both backends write the same bytes, except for floats in exponent notation (1e+16 with json, 1e16 with orjson)
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    if BACKEND == ORJSON_BACKEND:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0))
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data) if BACKEND == ORJSON_BACKEND else json.loads(data)
+
+
+def load(path: str) -> Any:
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+# e.g. collection.save_object(stac_io=CodecStacIO())
+class CodecStacIO(DefaultStacIO):
+    def json_loads(self, txt: str, *_args: Any, **_kwargs: Any) -> Any:
+        return loads(txt)
+
+    def json_dumps(self, json_dict: dict[str, Any], *_args: Any, **_kwargs: Any) -> str:
+        return dumps(json_dict, indent=True).decode("utf-8")
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Sequence
+
+import numpy as np
+from pyproj import Transformer
+from shapely.geometry import Polygon, box
+
+WGS84_EPSG = 4326
+# points added along each edge, as in rasterio.warp.transform_bounds
+DENSIFY_PTS = 21
+
+_local = threading.local()
+
+
+# one transformer per source CRS and thread, as pyproj transformers must not be shared between threads
+def get_transformer(epsg: int) -> Transformer:
+    transformers = _local.__dict__.setdefault("transformers", {})
+    if epsg not in transformers:
+        transformers[epsg] = Transformer.from_crs(epsg, WGS84_EPSG, always_xy=True)
+    return transformers[epsg]
+
+
+# one row of points per edge: left, bottom, right, top
+def densify_edges(bounds: np.ndarray, densify_pts: int) -> tuple[np.ndarray, np.ndarray]:
+    left, bottom, right, top = (bounds[:, [i]] for i in range(4))
+    steps = np.linspace(0, 1, densify_pts + 2)
+    count = steps.size
+    width, height = right - left, top - bottom
+    xs = np.hstack([left + width * steps, right.repeat(count, 1), right - width * steps, left.repeat(count, 1)])
+    ys = np.hstack([bottom.repeat(count, 1), bottom + height * steps, top.repeat(count, 1), top - height * steps])
+    return xs, ys
+
+
+# the edges are densified so that the result covers the curved transformed edges, bounds crossing the antimeridian are
+# not supported
+def transform_bounds(bounds: Sequence[Sequence[float]], epsg: int, densify_pts: int = DENSIFY_PTS) -> np.ndarray:
+    bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+    xs, ys = densify_edges(bounds, densify_pts)
+    lons, lats = get_transformer(epsg).transform(xs.ravel(), ys.ravel())
+    lons, lats = lons.reshape(xs.shape), lats.reshape(ys.shape)
+    return np.column_stack([lons.min(axis=1), lats.min(axis=1), lons.max(axis=1), lats.max(axis=1)])
+
+
+def get_footprints(bounds: Sequence[Sequence[float]], epsg: int) -> list[Polygon]:
+    return [box(*wgs84_bounds) for wgs84_bounds in transform_bounds(bounds, epsg).tolist()]
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from glob import glob
+from itertools import islice
+from typing import IO
+
+from shapely import to_wkb
+from shapely.geometry import shape
+
+from .codec import load, loads
+
+GEOPARQUET_VERSION = "1.1.0"
+STAC_GEOPARQUET_VERSION = "1.0.0"
+DATETIME_PROPERTIES = ("datetime", "start_datetime", "end_datetime", "created", "updated")
+TOP_LEVEL_COLUMNS = {
+    "type",
+    "stac_version",
+    "stac_extensions",
+    "id",
+    "geometry",
+    "bbox",
+    "links",
+    "assets",
+    "collection",
+}
+ROW_GROUP_SIZE = 10_000
+
+
+class GeoParquetExportError(Exception):
+    pass
+
+
+def open_ndjson(path: str) -> IO[bytes]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise GeoParquetExportError("Reading zstd compressed files requires zstandard.")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)  # noqa: SIM115
+    return open(path, "rb")  # noqa: SIM115
+
+
+def iter_ndjson_items(path: str) -> Iterator[dict]:
+    with open_ndjson(path) as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+
+def iter_tree_items(root: str) -> Iterator[dict]:
+    for path in sorted(glob(os.path.join(root, "**", "*.json"), recursive=True)):
+        stac_dict = load(path)
+        if stac_dict.get("type") == "Feature":
+            yield stac_dict
+
+
+def iter_items(sources: Iterable[str]) -> Iterator[dict]:
+    for source in sources:
+        if os.path.isdir(source):
+            yield from iter_tree_items(source)
+        else:
+            yield from iter_ndjson_items(source)
+
+
+def parse_datetime(value: str | None) -> datetime | None:
+    return None if value is None else datetime.fromisoformat(value)
+
+
+# stac-geoparquet layout: properties as top-level columns, links and assets as structs
+def to_row(item: dict) -> dict:
+    properties = item["properties"]
+    if clashes := set(properties) & TOP_LEVEL_COLUMNS:
+        raise GeoParquetExportError(f"Properties {sorted(clashes)} of {item['id']} clash with top-level columns.")
+    bbox = item["bbox"]
+    # 3D bboxes are ordered xmin, ymin, zmin, xmax, ymax, zmax
+    xmin, ymin, xmax, ymax = (bbox[0], bbox[1], bbox[3], bbox[4]) if len(bbox) == 6 else bbox
+    return {
+        "type": item["type"],
+        "stac_version": item["stac_version"],
+        "stac_extensions": item.get("stac_extensions", []),
+        "id": item["id"],
+        "geometry": to_wkb(shape(item["geometry"])) if item.get("geometry") else None,
+        "bbox": {"xmin": xmin, "ymin": ymin, "xmax": xmax, "ymax": ymax},
+        "links": item.get("links", []),
+        "assets": item.get("assets", {}),
+        "collection": item.get("collection"),
+        **{name: parse_datetime(value) if name in DATETIME_PROPERTIES else value for name, value in properties.items()},
+    }
+
+
+def infer_schema(items: Iterable[dict], row_group_size: int):
+    import pyarrow as pa
+
+    schemas = []
+    items = iter(items)
+    while batch := list(islice(items, row_group_size)):
+        try:
+            schemas.append(pa.Table.from_pylist([to_row(item) for item in batch]).schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as error:
+            raise GeoParquetExportError(f"Items have values of different types. Reason: {error}.")
+    if not schemas:
+        raise GeoParquetExportError("There are no items to export.")
+    try:
+        schema = pa.unify_schemas(schemas, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as error:
+        raise GeoParquetExportError(f"Items have values of different types. Reason: {error}.")
+    # datetimes are stored in UTC whatever the offset of the first values read, as the spec requires
+    field_types = {name: pa.timestamp("us", tz="UTC") for name in DATETIME_PROPERTIES} | {"proj:epsg": pa.int32()}
+    fields = [field.with_type(field_types[field.name]) if field.name in field_types else field for field in schema]
+    metadata = {
+        "geo": json.dumps(get_geo_metadata()),
+        "stac-geoparquet": json.dumps({"version": STAC_GEOPARQUET_VERSION}),
+    }
+    return pa.schema(fields, metadata=metadata)
+
+
+def get_geo_metadata() -> dict:
+    # the geometry types are not collected, so they are left unknown
+    column = {
+        "encoding": "WKB",
+        "geometry_types": [],
+        "covering": {"bbox": {key: ["bbox", key] for key in ("xmin", "ymin", "xmax", "ymax")}},
+    }
+    return {"version": GEOPARQUET_VERSION, "primary_column": "geometry", "columns": {"geometry": column}}
+
+
+# the sources are read twice, for the schema and then the rows, so that only one row group is held in memory
+def export_geoparquet(sources: list[str], output_path: str, row_group_size: int = ROW_GROUP_SIZE) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise GeoParquetExportError("Exporting GeoParquet requires pyarrow.")
+    schema = infer_schema(iter_items(sources), row_group_size)
+    count = 0
+    items = iter_items(sources)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+        while batch := list(islice(items, row_group_size)):
+            rows = [to_row(item) for item in batch]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema), row_group_size=row_group_size)
+            count += len(rows)
+    return count
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+DONE = "done"
+FAILED = "failed"
+
+
+# append-only log of the work units of a generator, the latest row of a key wins. A restarted run skips the keys done
+# from the same source.
+class ProgressJournal:
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS journal (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, status TEXT"
+            " NOT NULL, etag TEXT, last_modified TEXT, message TEXT, recorded TEXT NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS journal_key ON journal (key)")
+        rows = self._connection.execute(
+            "SELECT key, etag, last_modified FROM journal WHERE id IN (SELECT MAX(id) FROM journal GROUP BY key) AND"
+            " status = ?",
+            (DONE,),
+        )
+        self._done = {key: (etag, last_modified) for key, etag, last_modified in rows}
+
+    def __enter__(self) -> ProgressJournal:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def is_done(self, key: str, etag: str | None = None, last_modified: datetime | None = None) -> bool:
+        if key not in self._done:
+            return False
+        done_etag, done_last_modified = self._done[key]
+        if etag is not None and etag != done_etag:
+            return False
+        return last_modified is None or last_modified.isoformat() == done_last_modified
+
+    def record(
+        self,
+        key: str,
+        status: str,
+        etag: str | None = None,
+        last_modified: datetime | None = None,
+        message: str | None = None,
+    ) -> None:
+        last_modified = last_modified.isoformat() if last_modified is not None else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO journal (key, status, etag, last_modified, message, recorded) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, status, etag, last_modified, message, datetime.now(tz=timezone.utc).isoformat()),
+            )
+            if status == DONE:
+                self._done[key] = (etag, last_modified)
+            else:
+                self._done.pop(key, None)
+
+    def mark_done(self, key: str, etag: str | None = None, last_modified: datetime | None = None) -> None:
+        self.record(key, DONE, etag, last_modified)
+
+    def mark_failed(
+        self, key: str, message: str, etag: str | None = None, last_modified: datetime | None = None
+    ) -> None:
+        self.record(key, FAILED, etag, last_modified, message)
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import pystac
+
+CLMS_CATALOG_TITLE = "CLMS Catalog"
+
+
+# hrefs relative to <stac dir>/<collection id>/<dir>/<item>.json, so that nothing is read from disk or resolved
+def create_item_links(collection_id: str, collection_title: str) -> list[pystac.Link]:
+    collection_href = f"../{collection_id}.json"
+    return [
+        pystac.Link(pystac.RelType.ROOT, "../../clms_catalog.json", pystac.MediaType.JSON, CLMS_CATALOG_TITLE),
+        pystac.Link(pystac.RelType.PARENT, collection_href, pystac.MediaType.JSON, collection_title),
+        pystac.Link(pystac.RelType.COLLECTION, collection_href, pystac.MediaType.JSON, collection_title),
+    ]
+
+
+# unlike set_self_href, the self link has no owner, so to_dict does not resolve the root link to transform it
+def set_item_self_href(item: pystac.Item, href: str) -> None:
+    item.remove_links(pystac.RelType.SELF)
+    item.links.append(pystac.Link(pystac.RelType.SELF, href, pystac.MediaType.JSON))
@@ -1,16 +1,14 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
 
 import pystac
-from jsonschema import Draft7Validator
-from jsonschema.exceptions import best_match
 from pystac import MediaType
 from pystac.extensions.projection import ProjectionExtension
-from referencing import Registry, Resource
 
+from ..validator import find_validation_error, get_stac_validator
+from ..writer import write_stac_object
 from .constants import (
     CLMS_LICENSE,
     COLLECTION_DESCRIPTION,
@@ -30,15 +28,6 @@ class CollectionCreationError(Exception):
     pass
 
 
-def get_stac_validator(product_schema: str) -> Draft7Validator:
-    with open(product_schema, encoding="utf-8") as f:
-        schema = json.load(f)
-    registry = Registry().with_resources(
-        [("http://example.com/schema.json", Resource.from_contents(schema))],
-    )
-    return Draft7Validator({"$ref": "http://example.com/schema.json"}, registry=registry)
-
-
 def get_files(n2k_root: str, file_extension: str) -> list[str]:
     files = []
     for dirpath, _, filenames in os.walk(n2k_root):
@@ -162,8 +151,8 @@ def create_n2k_collection(n2k_root: str) -> None:
     try:
         collection = create_collection(n2k_root)
         validator = get_stac_validator("schema/products/n2k.json")
-        error_msg = best_match(validator.iter_errors(collection.to_dict()))
+        error_msg = find_validation_error(validator, collection.to_dict())
         assert error_msg is None, f"Failed to create {collection.id} collection. Reason: {error_msg}."
-        collection.save_object()
+        write_stac_object(collection)
     except (AssertionError, CollectionCreationError) as error:
         LOGGER.error(error)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import json
+import os
+from urllib.parse import urlsplit
+
+from pystac.validation.stac_validator import JsonSchemaSTACValidator
+
+SCHEMA_STORE_DIR = "schema/stac"
+STAC_VERSION = "1.0.0"
+STORE_SCHEMA_URIS = [
+    *(
+        f"https://schemas.stacspec.org/v{STAC_VERSION}/{name}-spec/json-schema/{name}.json"
+        for name in ("item", "catalog", "collection")
+    ),
+    "https://stac-extensions.github.io/projection/v1.1.0/schema.json",
+    "https://stac-extensions.github.io/item-assets/v1.0.0/schema.json",
+]
+
+
+# the store mirrors the host and path of the schema URIs
+def get_schema_path(schema_uri: str, store_dir: str = SCHEMA_STORE_DIR) -> str:
+    url = urlsplit(schema_uri)
+    return os.path.join(store_dir, url.netloc, *url.path.lstrip("/").split("/"))
+
+
+def get_schema_uri(schema_path: str, store_dir: str = SCHEMA_STORE_DIR) -> str:
+    return "https://" + os.path.relpath(schema_path, store_dir).replace(os.sep, "/")
+
+
+def load_schema_store(store_dir: str = SCHEMA_STORE_DIR) -> dict[str, dict]:
+    schemas = {}
+    for dirpath, _, filenames in os.walk(store_dir):
+        for filename in filenames:
+            if filename.endswith(".json"):
+                schema_path = os.path.join(dirpath, filename)
+                with open(schema_path, encoding="utf-8") as f:
+                    schemas[get_schema_uri(schema_path, store_dir)] = json.load(f)
+    return schemas
+
+
+# schemas missing from the store are still fetched
+def get_offline_stac_validator(store_dir: str = SCHEMA_STORE_DIR) -> JsonSchemaSTACValidator:
+    validator = JsonSchemaSTACValidator()
+    validator.schema_cache.update(load_schema_store(store_dir))
+    return validator
@@ -1,19 +1,19 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
 from enum import Enum
 
 import pystac
 from jsonschema import Draft7Validator
-from jsonschema.exceptions import best_match
 from pystac.extensions.item_assets import AssetDefinition, ItemAssetsExtension
 from pystac.extensions.projection import ProjectionExtension
 from pystac.link import Link
 from pystac.media_type import MediaType
-from referencing import Registry, Resource
 
+from ..assembler import link_item_summaries, link_items
+from ..validator import find_validation_error
+from ..writer import write_stac_object
 from .constants import (
     CLMS_LICENSE,
     COLLECTION_DESCRIPTION,
@@ -64,15 +64,6 @@ class UABHItemAssets(Enum):
     )
 
 
-def get_stac_validator(product_schema: str) -> Draft7Validator:
-    with open(product_schema, encoding="utf-8") as f:
-        schema = json.load(f)
-    registry = Registry().with_resources(
-        [("http://example.com/schema.json", Resource.from_contents(schema))],
-    )
-    return Draft7Validator({"$ref": "http://example.com/schema.json"}, registry=registry)
-
-
 def create_core_collection() -> pystac.Collection:
     return pystac.Collection(
         id=COLLECTION_ID,
@@ -99,19 +90,16 @@ def add_links_to_collection(collection: pystac.Collection, link_list: list[Link]
         collection.links.append(link)
 
 
-def add_items_to_collection(collection: pystac.Collection, item_list: list[str]) -> None:
-    for item in item_list:
-        stac_object = pystac.read_file(item)
-        collection.add_item(stac_object, title=stac_object.id)
-
-
-def create_collection(item_list: list[str]) -> None:
+# from the summary records of the items if given, instead of reading the item files
+def create_collection(item_list: list[str], item_summaries: list[dict] | None = None) -> None:
     try:
         collection = create_core_collection()
+        item_links, fold = link_items(item_list) if item_summaries is None else link_item_summaries(item_summaries)
+        for problem in fold.check(collection.extent):
+            LOGGER.warning("%s: %s.", collection.id, problem)
 
         # summaries
-        epsg_list = [3035]
-        add_summaries_to_collection(collection, epsg_list)
+        add_summaries_to_collection(collection, sorted(fold.epsg))
 
         # extensions
         add_item_assets_to_collection(collection, UABHItemAssets)
@@ -121,7 +109,7 @@ def create_collection(item_list: list[str]) -> None:
         add_links_to_collection(collection, link_list)
 
         # add items
-        add_items_to_collection(collection, item_list)
+        collection.add_links(item_links)
 
         # add self, root and parent links
         collection.set_self_href(os.path.join(WORKING_DIR, f"{STAC_DIR}/{collection.id}/{collection.id}.json"))
@@ -133,11 +121,13 @@ def create_collection(item_list: list[str]) -> None:
     return collection
 
 
-def create_uabh_collection(item_list: list[str], validator: Draft7Validator) -> None:
+def create_uabh_collection(
+    item_list: list[str], validator: Draft7Validator, item_summaries: list[dict] | None = None
+) -> None:
     try:
-        collection = create_collection(item_list)
-        error_msg = best_match(validator.iter_errors(collection.to_dict()))
+        collection = create_collection(item_list, item_summaries)
+        error_msg = find_validation_error(validator, collection.to_dict())
         assert error_msg is None, f"Failed to create {collection.id} collection. Reason: {error_msg}."
-        collection.save_object()
+        write_stac_object(collection)
     except (AssertionError, CollectionCreationError) as error:
         LOGGER.error(error)
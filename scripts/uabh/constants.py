@@ -6,11 +6,10 @@ import pystac
 from pystac.link import Link
 from pystac.provider import ProviderRole
 
+from ..links import create_item_links
+
 STAC_DIR = "stac_tests"
 WORKING_DIR = os.getcwd()
-CLMS_CATALOG_LINK: Final[Link] = Link(
-    rel=pystac.RelType.ROOT, target=pystac.STACObject.from_file(os.path.join(WORKING_DIR, "stacs/clms_catalog.json"))
-)
 CLMS_LICENSE: Final[Link] = Link(rel="license", target="https://land.copernicus.eu/en/data-policy")
 COLLECTION_DESCRIPTION = "Urban Atlas building height over capital cities."
 COLLECTION_EXTENT = pystac.Extent(
@@ -19,11 +18,10 @@ COLLECTION_EXTENT = pystac.Extent(
 )
 COLLECTION_ID = "urban-atlas-building-height"
 COLLECTION_KEYWORD = ["Buildings", "Building height", "Elevation"]
-COLLECTION_LINK: Final[Link] = Link(
-    rel=pystac.RelType.COLLECTION,
-    target=pystac.STACObject.from_file(os.path.join(WORKING_DIR, f"stacs/{COLLECTION_ID}/{COLLECTION_ID}.json")),
-)
 COLLECTION_TITLE = "Urban Atlas Building Height 10m"
+# summary records of the saved items, kept in the STAC directory, appended by create_uabh_items.py
+# and read by create_uabh_collection.py
+ITEM_SUMMARIES = os.path.join(WORKING_DIR, STAC_DIR, f"{COLLECTION_ID}.items.jsonl")
 HOST_AND_LICENSOR: Final[pystac.Provider] = pystac.Provider(
     name="Copernicus Land Monitoring Service",
     description=(
@@ -38,7 +36,6 @@ HOST_AND_LICENSOR: Final[pystac.Provider] = pystac.Provider(
     roles=[ProviderRole.LICENSOR, ProviderRole.HOST],
     url="https://land.copernicus.eu",
 )
-ITEM_PARENT_LINK: Final[Link] = Link(
-    rel=pystac.RelType.PARENT,
-    target=pystac.STACObject.from_file(os.path.join(WORKING_DIR, f"stacs/{COLLECTION_ID}/{COLLECTION_ID}.json")),
-)
+
+
+CLMS_CATALOG_LINK, ITEM_PARENT_LINK, COLLECTION_LINK = create_item_links(COLLECTION_ID, COLLECTION_TITLE)
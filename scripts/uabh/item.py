@@ -1,25 +1,27 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
 import re
 import xml.etree.ElementTree as ETree
-from datetime import datetime
+from datetime import datetime, timezone
 from glob import glob
 
 import pystac
 import rasterio as rio
 from jsonschema import Draft7Validator
-from jsonschema.exceptions import best_match
 from pystac.extensions.projection import ProjectionExtension
 from pystac.media_type import MediaType
 from rasterio.coords import BoundingBox
 from rasterio.crs import CRS
-from rasterio.warp import transform_bounds
-from referencing import Registry, Resource
-from shapely.geometry import Polygon, box, mapping
-
+from shapely.geometry import Polygon, mapping
+
+from ..assembler import ItemSummaryLog
+from ..footprint import get_footprints
+from ..journal import ProgressJournal
+from ..links import set_item_self_href
+from ..validator import find_validation_error
+from ..writer import BackgroundWriter, write_stac_object
 from .constants import (
     CLMS_CATALOG_LINK,
     CLMS_LICENSE,
@@ -81,10 +83,7 @@ def get_metadata_from_xml(xml: str) -> tuple[datetime, datetime, datetime]:
 
 
 def get_geom_wgs84(bounds: BoundingBox, crs: CRS) -> Polygon:
-    bbox = rio.coords.BoundingBox(
-        *transform_bounds(crs.to_epsg(), 4326, bounds.left, bounds.bottom, bounds.right, bounds.top)
-    )
-    return box(*(bbox.left, bbox.bottom, bbox.right, bbox.top))
+    return get_footprints([bounds], crs.to_epsg())[0]
 
 
 def get_description(product_id: str) -> str:
@@ -252,21 +251,54 @@ def create_item(zip_path: str) -> pystac.Item:
     return item
 
 
-def create_uabh_item(zip_path: str, validator: Draft7Validator) -> None:
+def record_saved(
+    item: pystac.Item,
+    zip_path: str,
+    last_modified: datetime,
+    journal: ProgressJournal | None,
+    summary_log: ItemSummaryLog | None,
+    error: Exception | None,
+) -> None:
+    if error is not None:
+        LOGGER.error("Failed to save %s item. Reason: %s.", zip_path, error)
+        if journal is not None:
+            journal.mark_failed(zip_path, str(error), last_modified=last_modified)
+        return
+    if summary_log is not None:
+        summary_log.record(item)
+    if journal is not None:
+        journal.mark_done(zip_path, last_modified=last_modified)
+
+
+def create_uabh_item(
+    zip_path: str,
+    validator: Draft7Validator,
+    journal: ProgressJournal | None = None,
+    writer: BackgroundWriter | None = None,
+    summary_log: ItemSummaryLog | None = None,
+) -> None:
+    last_modified = datetime.fromtimestamp(os.path.getmtime(zip_path), tz=timezone.utc)
+    if journal is not None and journal.is_done(zip_path, last_modified=last_modified):
+        return
     try:
         item = create_item(zip_path)
-        item.set_self_href(os.path.join(WORKING_DIR, f"{STAC_DIR}/{COLLECTION_ID}/{item.id}/{item.id}.json"))
-        error_msg = best_match(validator.iter_errors(item.to_dict()))
+        set_item_self_href(item, os.path.join(WORKING_DIR, f"{STAC_DIR}/{COLLECTION_ID}/{item.id}/{item.id}.json"))
+        error_msg = find_validation_error(validator, item.to_dict())
         assert error_msg is None, f"Failed to create {item.id} item. Reason: {error_msg}."
-        item.save_object()
     except (AssertionError, ItemCreationError) as error:
         LOGGER.error(error)
-
-
-def get_stac_validator(product_schema: str) -> Draft7Validator:
-    with open(product_schema, encoding="utf-8") as f:
-        schema = json.load(f)
-    registry = Registry().with_resources(
-        [("http://example.com/schema.json", Resource.from_contents(schema))],
-    )
-    return Draft7Validator({"$ref": "http://example.com/schema.json"}, registry=registry)
+        if journal is not None:
+            journal.mark_failed(zip_path, str(error), last_modified=last_modified)
+        return
+    if writer is not None:
+        writer.submit(
+            item,
+            lambda future: record_saved(item, zip_path, last_modified, journal, summary_log, future.exception()),
+        )
+        return
+    try:
+        write_stac_object(item)
+    except OSError as error:
+        record_saved(item, zip_path, last_modified, journal, summary_log, error)
+    else:
+        record_saved(item, zip_path, last_modified, journal, summary_log, None)
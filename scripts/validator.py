@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import tempfile
+import threading
+from collections.abc import Callable
+from itertools import count
+
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import ValidationError, best_match
+from referencing import Registry, Resource
+
+PRODUCT_SCHEMA_URI = "http://example.com/schema.json"
+JSONSCHEMA_BACKEND = "jsonschema"
+COMPILED_BACKEND = "compiled"
+
+_VALIDATORS: dict[tuple[str, str], Draft7Validator | CompiledValidator] = {}
+_LOCK = threading.Lock()
+
+
+# only the boolean check runs the code generated by fastjsonschema, errors are collected by the Draft7 validator so that
+# both backends report the same errors
+class CompiledValidator:
+    def __init__(self, validate: Callable[[dict], dict], validator: Draft7Validator):
+        from fastjsonschema import JsonSchemaException
+
+        self._validate = validate
+        self._exception = JsonSchemaException
+        self.validator = validator
+
+    def is_valid(self, instance: dict) -> bool:
+        try:
+            self._validate(instance)
+        except self._exception:
+            return False
+        return True
+
+    def iter_errors(self, instance: dict):
+        return self.validator.iter_errors(instance)
+
+
+def load_stac_validator(product_schema: str) -> Draft7Validator:
+    with open(product_schema, encoding="utf-8") as f:
+        schema = json.load(f)
+    registry = Registry().with_resources(
+        [(PRODUCT_SCHEMA_URI, Resource.from_contents(schema))],
+    )
+    return Draft7Validator({"$ref": PRODUCT_SCHEMA_URI}, registry=registry.crawl())
+
+
+# cached under the sha256 of the schema, so that it is only regenerated when the schema changes
+def load_compiled_validate(product_schema: str, cache_dir: str | None = None) -> Callable[[dict], dict]:
+    try:
+        import fastjsonschema
+    except ImportError:
+        raise ImportError("The compiled validator backend requires fastjsonschema.")
+    with open(product_schema, "rb") as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(product_schema)), "__pycache__")
+    module_path = os.path.join(cache_dir, f"schema_{digest}.py")
+    if not os.path.exists(module_path):
+        # defaults are not applied so that validation never modifies the document
+        code = fastjsonschema.compile_to_code(json.loads(content), use_default=False, use_formats=False)
+        # the root validation function is generated first and named after the schema id
+        root_function = re.search(r"^def (\w+)\(", code, re.MULTILINE).group(1)
+        code += f"\n\nvalidate = {root_function}\n"
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=cache_dir, suffix=".tmp", delete=False, encoding="utf-8") as f:
+            f.write(code)
+        os.replace(f.name, module_path)
+    spec = importlib.util.spec_from_file_location(f"schema_{digest}", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.validate
+
+
+# loaded once per process, validators are immutable and can be shared by threads
+def get_stac_validator(product_schema: str, backend: str = JSONSCHEMA_BACKEND) -> Draft7Validator | CompiledValidator:
+    if backend not in (JSONSCHEMA_BACKEND, COMPILED_BACKEND):
+        raise ValueError(f"Unknown validator backend {backend}.")
+    key = (os.path.abspath(product_schema), backend)
+    with _LOCK:
+        if key not in _VALIDATORS:
+            validator = load_stac_validator(product_schema)
+            if backend == COMPILED_BACKEND:
+                validator = CompiledValidator(load_compiled_validate(product_schema), validator)
+            _VALIDATORS[key] = validator
+        return _VALIDATORS[key]
+
+
+# only checks one in `every` documents, for trusted reruns
+class SampledValidator:
+    def __init__(self, validator: Draft7Validator | CompiledValidator, every: int = 1):
+        if every < 1:
+            raise ValueError(f"every must be a positive integer, got {every}")
+        self.validator = validator
+        self.every = every
+        self._counter = count()
+
+    def is_valid(self, instance: dict) -> bool:
+        if next(self._counter) % self.every:
+            return True
+        return self.validator.is_valid(instance)
+
+    def iter_errors(self, instance: dict):
+        return self.validator.iter_errors(instance)
+
+
+# errors are only collected and ranked for invalid documents
+def find_validation_error(
+    validator: Draft7Validator | CompiledValidator | SampledValidator, instance: dict
+) -> ValidationError | None:
+    if validator.is_valid(instance):
+        return None
+    return best_match(validator.iter_errors(instance))
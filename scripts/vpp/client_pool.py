@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import queue
+from collections.abc import Iterator
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import boto3
+from botocore.client import BaseClient
+from botocore.config import Config
+from rasterio.session import AWSSession
+
+
+# boto3 sessions are not thread-safe, so all clients are built up front in the calling thread
+class S3ClientPool:
+    def __init__(self, aws_session: boto3.Session, size: int, max_pool_connections: int = 10) -> None:
+        self.size = size
+        config = Config(max_pool_connections=max_pool_connections)
+        clients = [aws_session.client("s3", config=config) for _ in range(size)]
+        self._clients = queue.Queue()
+        for client in clients:
+            self._clients.put(client)
+        endpoint = urlparse(clients[0].meta.endpoint_url)
+        self.rio_session = AWSSession(aws_session, endpoint_url=endpoint.netloc)
+
+    @contextmanager
+    def client(self) -> Iterator[BaseClient]:
+        # never waits, as the workers are coroutines that would block the event loop
+        try:
+            client = self._clients.get_nowait()
+        except queue.Empty:
+            raise RuntimeError(f"All {self.size} S3 clients are in use.")
+        try:
+            yield client
+        finally:
+            self._clients.put(client)
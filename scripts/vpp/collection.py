@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
 
@@ -8,12 +7,13 @@ import pystac
 import pystac.extensions
 import pystac.extensions.projection
 from jsonschema import Draft7Validator
-from jsonschema.exceptions import best_match
 from pystac.extensions.item_assets import AssetDefinition, ItemAssetsExtension
 from pystac.extensions.projection import ProjectionExtension
 from pystac.link import Link
-from referencing import Registry, Resource
 
+from ..assembler import ItemFold, link_item_summaries, link_items
+from ..validator import find_validation_error
+from ..writer import write_stac_object
 from .constants import (
     CLMS_LICENSE,
     COLLECTION_DESCRIPTION,
@@ -35,15 +35,6 @@ class CollectionCreationError(Exception):
     pass
 
 
-def get_stac_validator(product_schema: str) -> Draft7Validator:
-    with open(product_schema, encoding="utf-8") as f:
-        schema = json.load(f)
-    registry = Registry().with_resources(
-        [("http://example.com/schema.json", Resource.from_contents(schema))],
-    )
-    return Draft7Validator({"$ref": "http://example.com/schema.json"}, registry=registry)
-
-
 def create_core_collection() -> pystac.Collection:
     return pystac.Collection(
         id=COLLECTION_ID,
@@ -73,49 +64,32 @@ def add_links_to_collection(collection: pystac.Collection, link_list: list[Link]
         collection.links.append(link)
 
 
-def add_items_to_collection(collection: pystac.Collection, item_list: list[str]) -> None:
-    for item in item_list:
-        stac_object = pystac.read_file(item)
-        collection.add_item(stac_object, title=stac_object.id)
+# e.g. AMPL for vpp_2022_s2_t40kcc-010m_v105_s2_ampl
+def get_item_asset_keys(fold: ItemFold) -> list[str]:
+    parameters = {key.rsplit("_", 1)[-1].upper() for key in fold.assets}
+    return [key for key in TITLE_MAP if key in parameters]
 
 
-def create_collection(item_list: list[str]) -> pystac.Collection:
+# from the summary records of the items if given, instead of reading the item files
+def create_collection(item_list: list[str], item_summaries: list[dict] | None = None) -> pystac.Collection:
     try:
         collection = create_core_collection()
+        item_links, fold = link_items(item_list) if item_summaries is None else link_item_summaries(item_summaries)
+        for problem in fold.check(collection.extent):
+            LOGGER.warning("%s: %s.", collection.id, problem)
 
         # summaries
-        epsg_list = [
-            32620,
-            32621,
-            32622,
-            32625,
-            32626,
-            32627,
-            32628,
-            32629,
-            32630,
-            32631,
-            32632,
-            32633,
-            32634,
-            32635,
-            32636,
-            32637,
-            32638,
-            32738,
-            32740,
-        ]
-        add_summaries_to_collection(collection, epsg_list)
+        add_summaries_to_collection(collection, sorted(fold.epsg))
 
         # extensions
-        add_item_assets_to_collection(collection, TITLE_MAP)
+        add_item_assets_to_collection(collection, {key: TITLE_MAP[key] for key in get_item_asset_keys(fold)})
 
         # links
         link_list = [CLMS_LICENSE]
         add_links_to_collection(collection, link_list)
 
         # add items
-        add_items_to_collection(collection, item_list)
+        collection.add_links(item_links)
 
         # add self, root, and parent links
         collection.set_self_href(os.path.join(WORKING_DIR, f"{STAC_DIR}/{collection.id}/{collection.id}.json"))
@@ -127,11 +101,13 @@ def create_collection(item_list: list[str]) -> pystac.Collection:
     return collection
 
 
-def create_vpp_collection(item_list: list[str], validator: Draft7Validator) -> None:
+def create_vpp_collection(
+    item_list: list[str], validator: Draft7Validator, item_summaries: list[dict] | None = None
+) -> None:
     try:
-        collection = create_collection(item_list)
-        error_msg = best_match(validator.iter_errors(collection.to_dict()))
+        collection = create_collection(item_list, item_summaries)
+        error_msg = find_validation_error(validator, collection.to_dict())
         assert error_msg is None, f"Failed to create {collection.id} collection. Reason: {error_msg}."
-        collection.save_object()
+        write_stac_object(collection)
     except (AssertionError, CollectionCreationError) as error:
         LOGGER.error(error)
@@ -1,5 +1,6 @@
 import os
 from datetime import datetime
+from functools import cache
 from typing import Final
 
 import boto3
@@ -7,7 +8,8 @@ import pystac
 from pystac.link import Link
 from pystac.provider import ProviderRole
 
-AWS_SESSION = boto3.Session(profile_name="hrvpp")
+from ..links import create_item_links
+
 BUCKET = "HRVPP"
 CLMS_LICENSE: Final[Link] = Link(rel="license", target="https://land.copernicus.eu/en/data-policy")
 COLLECTION_DESCRIPTION = (
@@ -36,6 +38,16 @@ COLLECTION_KEYWORDS = [
     "vegetation",
 ]
 COLLECTION_TITLE = "Vegetation Phenology and Productivity Parameters"
+# GDAL configuration for reading only the TIFF header (IFD and GeoKeys) of an S3 object with ranged GETs
+GDAL_HEADER_ONLY_OPTIONS = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "CPL_VSIL_CURL_ALLOWED_EXTENSIONS": ".tif",
+    "GDAL_INGESTED_BYTES_AT_OPEN": 32768,
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+    "GDAL_HTTP_MULTIPLEX": "YES",
+    "VSI_CACHE": "FALSE",
+    "AWS_VIRTUAL_HOSTING": "FALSE",
+}
 STAC_DIR = "stac_tests"
 TITLE_MAP = {
     "AMPL": "Season Amplitude",
@@ -72,14 +84,15 @@ VPP_PRODUCER_AND_PROCESSOR: Final[pystac.Provider] = pystac.Provider(
     url="https://vito.be",
 )
 WORKING_DIR = os.getcwd()
-CLMS_CATALOG_LINK: Final[Link] = Link(
-    rel=pystac.RelType.ROOT, target=pystac.STACObject.from_file(os.path.join(WORKING_DIR, "stacs/clms_catalog.json"))
-)
-COLLECTION_LINK: Final[Link] = Link(
-    rel=pystac.RelType.COLLECTION,
-    target=pystac.STACObject.from_file(os.path.join(WORKING_DIR, f"stacs/{COLLECTION_ID}/{COLLECTION_ID}.json")),
-)
-ITEM_PARENT_LINK: Final[Link] = Link(
-    rel=pystac.RelType.PARENT,
-    target=pystac.STACObject.from_file(os.path.join(WORKING_DIR, f"stacs/{COLLECTION_ID}/{COLLECTION_ID}.json")),
-)
+# summary records of the saved items, kept in the STAC directory, appended by create_vpp_items.py
+# and read by create_vpp_collection.py
+ITEM_SUMMARIES = os.path.join(WORKING_DIR, STAC_DIR, f"{COLLECTION_ID}.items.jsonl")
+
+
+# Resolved on first use, so that importing the VPP scripts neither reads credentials nor STAC files from disk
+@cache
+def get_aws_session() -> boto3.Session:
+    return boto3.Session(profile_name="hrvpp")
+
+
+CLMS_CATALOG_LINK, ITEM_PARENT_LINK, COLLECTION_LINK = create_item_links(COLLECTION_ID, COLLECTION_TITLE)
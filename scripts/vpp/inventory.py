@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import os
+import re
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from typing import IO
+from urllib.parse import unquote, urlparse
+
+from botocore.client import BaseClient
+
+# columns of the ORC and Parquet inventory formats, keyed by their name in the manifest fileSchema
+COLUMN_MAP = {
+    "Bucket": "bucket",
+    "Key": "key",
+    "Size": "size",
+    "LastModifiedDate": "last_modified_date",
+    "ETag": "e_tag",
+}
+
+
+class InventoryError(Exception):
+    pass
+
+
+def read_manifest(manifest_path: str, client: BaseClient | None = None) -> dict:
+    with open_inventory_file(manifest_path, client) as f:
+        return json.load(f)
+
+
+def open_inventory_file(location: str, client: BaseClient | None = None) -> IO[bytes]:
+    url = urlparse(location)
+    if url.scheme == "s3":
+        if client is None:
+            raise InventoryError(f"An S3 client is required to read {location}.")
+        body = client.get_object(Bucket=url.netloc, Key=url.path.lstrip("/"))["Body"].read()
+        return io.BytesIO(body)
+    return open(location, "rb")  # noqa: SIM115
+
+
+# data file keys are relative to the destination bucket, whose local copy is the closest ancestor of the manifest
+# holding the first data file
+def get_data_file_locations(manifest_path: str, manifest: dict) -> list[str]:
+    keys = [file["key"] for file in manifest["files"]]
+    if urlparse(manifest_path).scheme == "s3":
+        bucket = manifest["destinationBucket"].split(":")[-1]
+        return [f"s3://{bucket}/{key}" for key in keys]
+    root = os.path.dirname(os.path.abspath(manifest_path))
+    while not os.path.exists(os.path.join(root, keys[0])):
+        parent = os.path.dirname(root)
+        if parent == root:
+            raise InventoryError(f"Failed to find inventory data file {keys[0]} for {manifest_path}.")
+        root = parent
+    return [os.path.join(root, key) for key in keys]
+
+
+def parse_last_modified(value: str | datetime) -> datetime:
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    # columnar inventories may store timestamps without a time zone, they are in UTC like the listed ones
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+# list_objects_v2 quotes ETags, inventory reports do not
+def normalize_etag(etag: str) -> str:
+    return etag.strip('"')
+
+
+def to_object(key: str, size: str | int, etag: str, last_modified: str | datetime) -> dict:
+    return {
+        "Key": key,
+        "Size": int(size),
+        "ETag": normalize_etag(etag),
+        "LastModified": parse_last_modified(last_modified),
+    }
+
+
+def read_csv(f: IO[bytes], file_schema: list[str]) -> Iterator[dict]:
+    columns = {name: file_schema.index(name) for name in COLUMN_MAP}
+    with gzip.open(f, "rt", encoding="utf-8", newline="") as text:
+        for row in csv.reader(text):
+            # keys are URL-encoded in CSV inventories only
+            yield to_object(
+                unquote(row[columns["Key"]]),
+                row[columns["Size"]],
+                row[columns["ETag"]],
+                row[columns["LastModifiedDate"]],
+            )
+
+
+def read_columnar(f: IO[bytes], file_format: str) -> Iterator[dict]:
+    try:
+        import pyarrow.orc
+        import pyarrow.parquet
+    except ImportError:
+        raise InventoryError(f"Reading {file_format} inventories requires pyarrow.")
+    columns = [COLUMN_MAP[name] for name in ("Key", "Size", "ETag", "LastModifiedDate")]
+    if file_format == "Parquet":
+        batches = pyarrow.parquet.ParquetFile(f).iter_batches(columns=columns)
+    else:
+        orc_file = pyarrow.orc.ORCFile(f)
+        batches = (orc_file.read_stripe(index, columns=columns) for index in range(orc_file.nstripes))
+    for batch in batches:
+        for row in batch.to_pylist():
+            yield to_object(*(row[column] for column in columns))
+
+
+# objects shaped like those of list_tile_objects, from S3 (s3:// locations, which require client) or local disk
+def read_inventory(manifest_path: str, client: BaseClient | None = None) -> Iterator[dict]:
+    manifest = read_manifest(manifest_path, client)
+    file_format = manifest["fileFormat"]
+    if file_format not in ("CSV", "ORC", "Parquet"):
+        raise InventoryError(f"Unsupported inventory format {file_format}.")
+    file_schema = [name.strip() for name in manifest["fileSchema"].split(",")]
+    if file_format == "CSV":
+        missing = [name for name in COLUMN_MAP if name not in file_schema]
+    else:
+        # the fileSchema of ORC and Parquet reports is a struct or message schema, e.g. struct<bucket:string,...>
+        missing = [
+            name for name, column in COLUMN_MAP.items() if not re.search(rf"\b{column}\b", manifest["fileSchema"])
+        ]
+    if missing:
+        raise InventoryError(f"Inventory report does not include {', '.join(missing)}.")
+    for location in get_data_file_locations(manifest_path, manifest):
+        with open_inventory_file(location, client) as f:
+            if file_format == "CSV":
+                yield from read_csv(f, file_schema)
+            else:
+                yield from read_columnar(f, file_format)
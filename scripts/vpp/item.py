@@ -1,30 +1,35 @@
 from __future__ import annotations
 
 import io
-import json
 import logging
 import os
+from collections.abc import Iterable, Iterator
 from datetime import datetime
+from functools import cache
+from urllib.parse import urlparse
 
-import boto3
 import pystac
 import rasterio as rio
+from botocore.client import BaseClient
 from botocore.paginate import PageIterator
 from jsonschema import Draft7Validator
-from jsonschema.exceptions import best_match
 from pystac.extensions.projection import ProjectionExtension
+from pystac.utils import datetime_to_str
 from rasterio.coords import BoundingBox
 from rasterio.crs import CRS
-from rasterio.warp import transform_bounds
-from referencing import Registry, Resource
-from shapely.geometry import Polygon, box, mapping
+from rasterio.session import AWSSession
+from shapely.geometry import Polygon, mapping
 
+from ..footprint import get_footprints
+from ..validator import find_validation_error
+from ..writer import ItemDocument
 from .constants import (
     BUCKET,
     CLMS_CATALOG_LINK,
     CLMS_LICENSE,
     COLLECTION_ID,
     COLLECTION_LINK,
+    GDAL_HEADER_ONLY_OPTIONS,
     ITEM_PARENT_LINK,
     STAC_DIR,
     TITLE_MAP,
@@ -32,6 +37,8 @@ from .constants import (
     VPP_PRODUCER_AND_PROCESSOR,
     WORKING_DIR,
 )
+from .inventory import normalize_etag
+from .tile_grid import GridTile, TileGridCache, get_grid_key
 
 LOGGER = logging.getLogger(__name__)
 
@@ -48,29 +55,79 @@ def create_product_list(start_year: int, end_year: int) -> list[str]:
     return product_list
 
 
-def create_page_iterator(aws_session: boto3.Session, bucket: str, prefix: str) -> PageIterator:
-    client = aws_session.client("s3")
+def create_page_iterator(client: BaseClient, bucket: str, prefix: str) -> PageIterator:
     paginator = client.get_paginator("list_objects_v2")
     return paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="-")
 
 
-def read_metadata_from_s3(bucket: str, key: str, aws_session: boto3.Session) -> tuple[BoundingBox, CRS, int, int]:
-    s3 = aws_session.resource("s3")
-    obj = s3.Object(bucket, key)
-    body = obj.get()["Body"].read()
-    with rio.open(io.BytesIO(body)) as tif:
-        bounds = tif.bounds
-        crs = tif.crs
-        height = tif.height
-        width = tif.width
-    return (bounds, crs, height, width, obj.last_modified)
+def get_tile_prefix(key: str, prefix: str) -> str | None:
+    index = key.find("-", len(prefix))
+    return key[: index + 1] if index != -1 else None
+
+
+# keys are listed in order, so the objects of a tile are contiguous and one tile is held in memory at a time
+def list_tile_objects(client: BaseClient, bucket: str, prefix: str) -> Iterator[tuple[str, list[dict]]]:
+    paginator = client.get_paginator("list_objects_v2")
+    tile, objects = None, []
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            obj_tile = get_tile_prefix(obj["Key"], prefix)
+            if obj_tile is None or not obj["Key"].endswith(".tif"):
+                continue
+            if obj_tile != tile:
+                if objects:
+                    yield tile, objects
+                tile, objects = obj_tile, []
+            objects.append({**obj, "ETag": normalize_etag(obj["ETag"])})
+    if objects:
+        yield tile, objects
+
+
+# inventory reports are not sorted, so all the objects are read before the first tile is yielded
+def group_tile_objects(objects: Iterable[dict], product_list: list[str]) -> Iterator[tuple[str, list[dict]]]:
+    tiles = {}
+    for obj in objects:
+        prefix = next((product for product in product_list if obj["Key"].startswith(product)), None)
+        if prefix is None or not obj["Key"].endswith(".tif"):
+            continue
+        tile = get_tile_prefix(obj["Key"], prefix)
+        if tile is not None:
+            tiles.setdefault(tile, []).append(obj)
+    for tile in sorted(tiles):
+        yield tile, sorted(tiles[tile], key=lambda obj: obj["Key"])
+
+
+def read_metadata_from_s3(
+    bucket: str,
+    key: str,
+    client: BaseClient,
+    rio_session: AWSSession | None = None,
+    last_modified: datetime | None = None,
+) -> tuple[BoundingBox, CRS, int, int, datetime]:
+    if rio_session is not None:
+        # GDAL only fetches the byte ranges holding the IFD and GeoKeys instead of the whole GeoTIFF
+        if last_modified is None:
+            last_modified = client.head_object(Bucket=bucket, Key=key)["LastModified"]
+        https = "YES" if urlparse(client.meta.endpoint_url).scheme == "https" else "NO"
+        with rio.Env(rio_session, AWS_HTTPS=https, **GDAL_HEADER_ONLY_OPTIONS):
+            with rio.open(f"/vsis3/{bucket}/{key}") as tif:
+                bounds = tif.bounds
+                crs = tif.crs
+                height = tif.height
+                width = tif.width
+    else:
+        obj = client.get_object(Bucket=bucket, Key=key)
+        last_modified = obj["LastModified"]
+        with rio.open(io.BytesIO(obj["Body"].read())) as tif:
+            bounds = tif.bounds
+            crs = tif.crs
+            height = tif.height
+            width = tif.width
+    return (bounds, crs, height, width, last_modified)
 
 
 def get_geom_wgs84(bounds: BoundingBox, crs: CRS) -> Polygon:
-    bbox = rio.coords.BoundingBox(
-        *transform_bounds(crs.to_epsg(), 4326, bounds.left, bounds.bottom, bounds.right, bounds.top)
-    )
-    return box(*(bbox.left, bbox.bottom, bbox.right, bbox.top))
+    return get_footprints([bounds], crs.to_epsg())[0]
 
 
 def get_description(product_id: str) -> str:
@@ -78,6 +135,10 @@ def get_description(product_id: str) -> str:
     return f"The {year} season {season[-1]} {product} product of tile {tile_res[:6]} at {tile_res[8:10]} m resolution."
 
 
+def shard_by_tile(item: pystac.Item | ItemDocument) -> str:
+    return item.id.split("_")[3][:6]
+
+
 def get_datetime(product_id: str) -> tuple[datetime, datetime]:
     year = int(product_id.split("_")[1])
     return (datetime(year=year, month=1, day=1), datetime(year=year, month=12, day=31))
@@ -124,9 +185,11 @@ def add_providers_to_item(item: pystac.Item, provider_list: list[pystac.Provider
     item.common_metadata.providers = provider_list
 
 
-def add_projection_extension_to_item(item: pystac.Item, crs: CRS, bounds: BoundingBox, height: int, width: int) -> None:
+def add_projection_extension_to_item(
+    item: pystac.Item, epsg: int, bounds: BoundingBox, height: int, width: int
+) -> None:
     projection = ProjectionExtension.ext(item, add_if_missing=True)
-    projection.epsg = crs.to_epsg()
+    projection.epsg = epsg
     projection.bbox = [int(bounds.left), int(bounds.bottom), int(bounds.right), int(bounds.top)]
     projection.shape = [height, width]
 
@@ -141,15 +204,50 @@ def add_assets_to_item(item: pystac.Item, asset_dict: dict[str, pystac.Asset]) -
         item.add_asset(key, asset)
 
 
-def create_item(aws_session: boto3.Session, bucket: str, tile: str) -> pystac.Item:
-    try:
-        client = aws_session.client("s3")
+# with a tile_grid, the grid of a tile is only read from S3 once for all years
+def read_tile(
+    client: BaseClient,
+    bucket: str,
+    tile: str,
+    rio_session: AWSSession | None = None,
+    objects: list[dict] | None = None,
+    tile_grid: TileGridCache | None = None,
+) -> tuple[str, list[str], GridTile, datetime]:
+    if objects is None:
         parameters = client.list_objects(Bucket=bucket, Prefix=tile, Delimiter=".")["CommonPrefixes"]
         asset_keys = [parameter["Prefix"] + "tif" for parameter in parameters]
-        _, tail = os.path.split(asset_keys[0])
-        product_id = "_".join((tail[:23], tail[29:31]))
-        bounds, crs, height, width, created = read_metadata_from_s3(bucket, asset_keys[0], aws_session)
-        geom_wgs84 = get_geom_wgs84(bounds, crs)
+        last_modified = None
+    else:
+        asset_keys = [obj["Key"] for obj in objects]
+        last_modified = objects[0]["LastModified"]
+    _, tail = os.path.split(asset_keys[0])
+    product_id = "_".join((tail[:23], tail[29:31]))
+    grid_tile = tile_grid.get(*get_grid_key(product_id)) if tile_grid is not None else None
+    if grid_tile is None:
+        bounds, crs, height, width, created = read_metadata_from_s3(
+            bucket, asset_keys[0], client, rio_session, last_modified
+        )
+        grid_tile = GridTile(bounds, crs.to_epsg(), height, width, get_geom_wgs84(bounds, crs))
+        if tile_grid is not None:
+            tile_grid.add(*get_grid_key(product_id), grid_tile)
+    elif last_modified is not None:
+        created = last_modified
+    else:
+        created = client.head_object(Bucket=bucket, Key=asset_keys[0])["LastModified"]
+    return product_id, asset_keys, grid_tile, created
+
+
+def create_item(
+    client: BaseClient,
+    bucket: str,
+    tile: str,
+    rio_session: AWSSession | None = None,
+    objects: list[dict] | None = None,
+    tile_grid: TileGridCache | None = None,
+) -> pystac.Item:
+    try:
+        product_id, asset_keys, grid_tile, created = read_tile(client, bucket, tile, rio_session, objects, tile_grid)
+        bounds, epsg, height, width, geom_wgs84 = grid_tile
         description = get_description(product_id)
         start_datetime, end_datetime = get_datetime(product_id)
 
@@ -163,7 +261,7 @@ def create_item(aws_session: boto3.Session, bucket: str, tile: str) -> pystac.It
         add_providers_to_item(item, provider_list)
 
         # extensions
-        add_projection_extension_to_item(item, crs, bounds, height, width)
+        add_projection_extension_to_item(item, epsg, bounds, height, width)
 
         # links
         link_list = [CLMS_LICENSE, CLMS_CATALOG_LINK, ITEM_PARENT_LINK, COLLECTION_LINK]
@@ -177,21 +275,77 @@ def create_item(aws_session: boto3.Session, bucket: str, tile: str) -> pystac.It
     return item
 
 
-def get_stac_validator(product_schema: str) -> Draft7Validator:
-    with open(product_schema, encoding="utf-8") as f:
-        schema = json.load(f)
-    registry = Registry().with_resources(
-        [("http://example.com/schema.json", Resource.from_contents(schema))],
-    )
-    return Draft7Validator({"$ref": "http://example.com/schema.json"}, registry=registry)
+def get_item_href(item_id: str) -> str:
+    return os.path.join(WORKING_DIR, f"{STAC_DIR}/{COLLECTION_ID}/{item_id}/{item_id}.json")
+
 
+# parts shared by all items, as serialized by pystac, which must not be modified
+@cache
+def get_item_template() -> dict:
+    return {
+        "providers": [provider.to_dict() for provider in (VPP_HOST_AND_LICENSOR, VPP_PRODUCER_AND_PROCESSOR)],
+        "links": [link.to_dict() for link in (CLMS_LICENSE, CLMS_CATALOG_LINK, ITEM_PARENT_LINK, COLLECTION_LINK)],
+        "stac_extensions": [ProjectionExtension.get_schema_uri()],
+    }
 
-def create_vpp_item(aws_session: boto3.Session, bucket: str, validator: Draft7Validator, tile: str) -> None:
+
+def create_asset_dict(asset_key: str) -> dict:
+    parameter = asset_key.split("_")[-1].split(".")[0]
+    version = asset_key.split("_")[-3]
+    return {
+        "href": create_asset_href(BUCKET, asset_key),
+        "type": pystac.MediaType.GEOTIFF,
+        "title": TITLE_MAP[parameter] + f" {version}",
+        "roles": ["data"],
+    }
+
+
+# the dict pystac serializes the item of create_item to, with only the fields of the tile filled into the template
+def create_item_document(
+    product_id: str, asset_keys: list[str], grid_tile: GridTile, created: datetime
+) -> ItemDocument:
+    template = get_item_template()
+    bounds, epsg, height, width, geometry = grid_tile
+    start_datetime, end_datetime = get_datetime(product_id)
+    self_href = get_item_href(product_id)
+    stac_dict = {
+        "type": "Feature",
+        "stac_version": pystac.get_stac_version(),
+        "id": product_id,
+        "properties": {
+            "created": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "description": get_description(product_id),
+            "start_datetime": datetime_to_str(start_datetime),
+            "end_datetime": datetime_to_str(end_datetime),
+            "providers": template["providers"],
+            "proj:epsg": epsg,
+            "proj:bbox": [int(bounds.left), int(bounds.bottom), int(bounds.right), int(bounds.top)],
+            "proj:shape": [height, width],
+            "datetime": None,
+        },
+        "geometry": mapping(geometry),
+        "links": [*template["links"], {"rel": pystac.RelType.SELF, "href": self_href, "type": pystac.MediaType.JSON}],
+        "assets": {os.path.split(key)[-1][:-4].lower(): create_asset_dict(key) for key in asset_keys},
+        "bbox": list(geometry.bounds),
+        "stac_extensions": template["stac_extensions"],
+        "collection": COLLECTION_ID,
+    }
+    return ItemDocument(stac_dict, self_href)
+
+
+def build_vpp_item(
+    client: BaseClient,
+    bucket: str,
+    validator: Draft7Validator,
+    tile: str,
+    rio_session: AWSSession | None = None,
+    objects: list[dict] | None = None,
+    tile_grid: TileGridCache | None = None,
+) -> ItemDocument:
     try:
-        item = create_item(aws_session, bucket, tile)
-        item.set_self_href(os.path.join(WORKING_DIR, f"{STAC_DIR}/{COLLECTION_ID}/{item.id}/{item.id}.json"))
-        error_msg = best_match(validator.iter_errors(item.to_dict()))
-        assert error_msg is None, f"Failed to create {item.id} item. Reason: {error_msg}."
-        item.save_object()
-    except (AssertionError, ItemCreationError) as error:
-        LOGGER.error(error)
+        item = create_item_document(*read_tile(client, bucket, tile, rio_session, objects, tile_grid))
+    except Exception as error:
+        raise ItemCreationError(error)
+    error_msg = find_validation_error(validator, item.to_dict())
+    assert error_msg is None, f"Failed to create {item.id} item. Reason: {error_msg}."
+    return item
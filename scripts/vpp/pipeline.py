@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+
+from botocore.client import BaseClient
+from jsonschema import Draft7Validator
+from tqdm import tqdm
+
+from ..assembler import ItemSummaryLog
+from ..journal import ProgressJournal
+from ..writer import BackgroundWriter, ItemWriter
+from .client_pool import S3ClientPool
+from .item import ItemCreationError, build_vpp_item, create_page_iterator, list_tile_objects
+from .tile_grid import TileGridCache
+
+LOGGER = logging.getLogger(__name__)
+
+
+# the client pool of run_pipeline must hold num_workers + 1 clients, one per worker and one for listing
+@dataclass
+class PipelineConfig:
+    num_workers: int = 100
+    num_writers: int = 4
+    # tiles and items held in the queues between the stages
+    queue_size: int = 1000
+    # list the objects of each product prefix at once, instead of every tile prefix and then its objects
+    bulk_listing: bool = True
+    # tiles and their objects, e.g. grouped from an S3 Inventory report, instead of listing the bucket
+    tiles: Iterable[tuple[str, list | None]] | None = None
+    # skips tiles already saved from the same source and records every outcome
+    journal: ProgressJournal | None = None
+    # left open, by default an `ItemWriter` with `num_writers` threads
+    writer: BackgroundWriter | None = None
+    # records a summary of every saved item, to assemble the collection from
+    summary_log: ItemSummaryLog | None = None
+    # spares reading the bounds, shape and footprint of a tile for every product
+    tile_grid: TileGridCache | None = None
+
+
+def iter_tiles(client: BaseClient, bucket: str, product: str, bulk_listing: bool) -> Iterator[tuple[str, list | None]]:
+    if bulk_listing:
+        yield from list_tile_objects(client, bucket, product)
+    else:
+        for page in create_page_iterator(client, bucket, product):
+            for prefix in page.get("CommonPrefixes", []):
+                yield prefix["Prefix"], None
+
+
+def get_tile_source(objects: list[dict] | None) -> tuple[str | None, datetime | None]:
+    if not objects:
+        return None, None
+    return objects[0]["ETag"], objects[0]["LastModified"]
+
+
+async def list_tiles(
+    client_pool: S3ClientPool,
+    bucket: str,
+    product_list: list[str],
+    tile_queue: asyncio.Queue,
+    config: PipelineConfig,
+) -> None:
+    journal = config.journal
+    with client_pool.client() as client:
+        if config.tiles is None:
+            tile_iterators = [iter_tiles(client, bucket, product, config.bulk_listing) for product in product_list]
+        else:
+            tile_iterators = [iter(config.tiles)]
+        for tile_iterator in tile_iterators:
+            while (tile := await asyncio.to_thread(next, tile_iterator, None)) is not None:
+                prefix, objects = tile
+                if journal is not None and journal.is_done(prefix, *get_tile_source(objects)):
+                    continue
+                await tile_queue.put(tile)
+    for _ in range(config.num_workers):
+        await tile_queue.put(None)
+
+
+async def build_items(
+    client_pool: S3ClientPool,
+    bucket: str,
+    validator: Draft7Validator,
+    tile_queue: asyncio.Queue,
+    item_queue: asyncio.Queue,
+    config: PipelineConfig,
+) -> None:
+    journal = config.journal
+    # each worker keeps the same client, and with it its connections, for its whole lifetime
+    with client_pool.client() as client:
+        while (tile := await tile_queue.get()) is not None:
+            prefix, objects = tile
+            try:
+                item = await asyncio.to_thread(
+                    build_vpp_item,
+                    client,
+                    bucket,
+                    validator,
+                    prefix,
+                    client_pool.rio_session,
+                    objects,
+                    config.tile_grid,
+                )
+            except (AssertionError, ItemCreationError) as error:
+                LOGGER.error(error)
+                if journal is not None:
+                    journal.mark_failed(prefix, str(error), *get_tile_source(objects))
+                continue
+            await item_queue.put((item, prefix, objects))
+
+
+def record_saved(entry: tuple, progress: tqdm, config: PipelineConfig, future: asyncio.Future) -> None:
+    item, prefix, objects = entry
+    if (error := future.exception()) is not None:
+        LOGGER.error("Failed to save %s item. Reason: %s.", item.id, error)
+        if config.journal is not None:
+            config.journal.mark_failed(prefix, str(error), *get_tile_source(objects))
+    else:
+        if config.summary_log is not None:
+            config.summary_log.record(item)
+        if config.journal is not None:
+            config.journal.mark_done(prefix, *get_tile_source(objects))
+    progress.update()
+
+
+async def save_items(
+    item_queue: asyncio.Queue,
+    writer: BackgroundWriter,
+    progress: tqdm,
+    config: PipelineConfig,
+) -> None:
+    # items are not awaited one by one, so that writers syncing in batches get whole batches, and are recorded as
+    # their writes complete
+    saving = set()
+    while (entry := await item_queue.get()) is not None:
+        # blocks while the writer holds `max_pending` unsaved items
+        future = asyncio.wrap_future(await asyncio.to_thread(writer.submit, entry[0]))
+        saving.add(future)
+        future.add_done_callback(saving.discard)
+        future.add_done_callback(partial(record_saved, entry, progress, config))
+    await asyncio.gather(*saving, return_exceptions=True)
+
+
+async def run_pipeline(
+    client_pool: S3ClientPool,
+    bucket: str,
+    validator: Draft7Validator,
+    product_list: list[str],
+    config: PipelineConfig | None = None,
+) -> None:
+    config = config or PipelineConfig()
+    if client_pool.size < config.num_workers + 1:
+        raise ValueError(f"The client pool holds {client_pool.size} clients, {config.num_workers + 1} are needed.")
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=config.num_workers + 1))
+    tile_queue = asyncio.Queue(maxsize=config.queue_size)
+    item_queue = asyncio.Queue(maxsize=config.queue_size)
+    writer = config.writer
+    with tqdm(unit="item") as progress, nullcontext(writer) if writer else ItemWriter(config.num_writers) as writer:
+        writers = [
+            asyncio.create_task(save_items(item_queue, writer, progress, config)) for _ in range(config.num_writers)
+        ]
+        await asyncio.gather(
+            list_tiles(client_pool, bucket, product_list, tile_queue, config),
+            *(
+                build_items(client_pool, bucket, validator, tile_queue, item_queue, config)
+                for _ in range(config.num_workers)
+            ),
+        )
+        for _ in range(config.num_writers):
+            await item_queue.put(None)
+        await asyncio.gather(*writers)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from typing import NamedTuple
+
+from rasterio.coords import BoundingBox
+from shapely.geometry import Polygon, mapping, shape
+
+
+class GridTile(NamedTuple):
+    bounds: BoundingBox
+    epsg: int
+    height: int
+    width: int
+    geometry: Polygon
+
+
+# e.g. ("T40KCC", "010m") for VPP_2022_S2_T40KCC-010m_s2
+def get_grid_key(product_id: str) -> tuple[str, str]:
+    tile_res = product_id.split("_")[3]
+    tile_id, resolution = tile_res.split("-")
+    return tile_id, resolution
+
+
+# grids of the Sentinel-2 tiles, the same every year and season, so that their headers are read once across runs
+class TileGridCache:
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS tile_grid (tile_id TEXT NOT NULL, resolution TEXT NOT NULL, bounds TEXT NOT"
+            " NULL, epsg INTEGER NOT NULL, height INTEGER NOT NULL, width INTEGER NOT NULL, geometry TEXT NOT NULL,"
+            " PRIMARY KEY (tile_id, resolution))"
+        )
+        rows = self._connection.execute(
+            "SELECT tile_id, resolution, bounds, epsg, height, width, geometry FROM tile_grid"
+        )
+        self._tiles = {
+            (tile_id, resolution): GridTile(
+                BoundingBox(*json.loads(bounds)), epsg, height, width, shape(json.loads(geometry))
+            )
+            for tile_id, resolution, bounds, epsg, height, width, geometry in rows
+        }
+
+    def __enter__(self) -> TileGridCache:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def get(self, tile_id: str, resolution: str) -> GridTile | None:
+        return self._tiles.get((tile_id, resolution))
+
+    def add(self, tile_id: str, resolution: str, grid_tile: GridTile) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO tile_grid (tile_id, resolution, bounds, epsg, height, width, geometry) VALUES"
+                " (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    tile_id,
+                    resolution,
+                    json.dumps(list(grid_tile.bounds)),
+                    grid_tile.epsg,
+                    grid_tile.height,
+                    grid_tile.width,
+                    json.dumps(mapping(grid_tile.geometry)),
+                ),
+            )
+            self._tiles[(tile_id, resolution)] = grid_tile
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import gzip
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import IO
+
+import pystac
+
+from .codec import dumps
+
+TREE_FORMAT = "tree"
+NDJSON_FORMAT = "ndjson"
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+# an item as the dict pystac.Item.to_dict returns, written and recorded like a pystac.Item
+class ItemDocument:
+    def __init__(self, stac_dict: dict, self_href: str):
+        self.stac_dict = stac_dict
+        self.self_href = self_href
+
+    @property
+    def id(self) -> str:
+        return self.stac_dict["id"]
+
+    @property
+    def properties(self) -> dict:
+        return self.stac_dict["properties"]
+
+    def get_self_href(self) -> str:
+        return self.self_href
+
+    def to_dict(self, include_self_link: bool = True, transform_hrefs: bool = True) -> dict:  # noqa: ARG002
+        if include_self_link:
+            return self.stac_dict
+        links = [link for link in self.stac_dict["links"] if link["rel"] != pystac.RelType.SELF]
+        return {**self.stac_dict, "links": links}
+
+
+# the bytes save_object writes
+def serialize_stac_object(stac_object: pystac.STACObject | ItemDocument) -> bytes:
+    return dumps(stac_object.to_dict(include_self_link=True), indent=True)
+
+
+# through a temporary file renamed in place, so that readers never see it half-written
+def write_atomic(path: str, data: bytes) -> None:
+    # created with the permissions `open` gives new files, unlike the owner-only ones of `tempfile`
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+def write_stac_object(stac_object: pystac.STACObject) -> str:
+    path = stac_object.get_self_href()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, serialize_stac_object(stac_object))
+    return path
+
+
+def open_compressed(path: str, compression: str | None) -> IO[bytes]:
+    if compression is None:
+        return open(path, "xb")  # noqa: SIM115
+    if compression == "gzip":
+        return gzip.open(path, "xb")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Writing zstd compressed files requires zstandard.")
+        return zstandard.ZstdCompressor().stream_writer(open(path, "xb"), closefd=True)  # noqa: SIM115
+    raise ValueError(f"Unknown compression {compression}.")
+
+
+# also flushes the compressor to a block boundary, so that the data written so far can be read back
+def sync_file(f: IO[bytes]) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def shard_by_year(item: pystac.Item | ItemDocument) -> str:
+    if isinstance(item, ItemDocument):
+        return (item.properties["datetime"] or item.properties["start_datetime"])[:4]
+    return str((item.datetime or item.common_metadata.start_datetime).year)
+
+
+# objects are serialized in the writer threads, so they must not be modified once submitted
+class BackgroundWriter(ABC):
+    def __init__(self, num_threads: int, max_pending: int | None = None):
+        self._executor = ThreadPoolExecutor(num_threads, thread_name_prefix=type(self).__name__)
+        self._slots = threading.BoundedSemaphore(max_pending or num_threads * 64)
+        self._queued = 0
+        self._queued_lock = threading.Lock()
+
+    @abstractmethod
+    def write(self, stac_object: pystac.STACObject) -> str: ...
+
+    def written(self, future: Future, path: str) -> None:
+        # writers that make their output durable in batches resolve the future once the batch is
+        future.set_result(path)
+
+    def is_idle(self) -> bool:
+        return self._queued == 0
+
+    def _write(self, stac_object: pystac.STACObject, future: Future) -> None:
+        with self._queued_lock:
+            self._queued -= 1
+        try:
+            path = self.write(stac_object)
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            self.written(future, path)
+
+    # blocks while max_pending objects are unsaved
+    def submit(self, stac_object: pystac.STACObject, callback: Callable[[Future], None] | None = None) -> Future:
+        self._slots.acquire()
+        future = Future()
+        future.add_done_callback(lambda _: self._slots.release())
+        if callback is not None:
+            future.add_done_callback(callback)
+        with self._queued_lock:
+            self._queued += 1
+        self._executor.submit(self._write, stac_object, future)
+        return future
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> BackgroundWriter:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+# the layout save_object produces
+class ItemWriter(BackgroundWriter):
+    def __init__(self, num_threads: int = 4, max_pending: int | None = None):
+        super().__init__(num_threads, max_pending)
+        self._dirs: set[str] = set()
+        self._lock = threading.Lock()
+
+    def make_dirs(self, dirname: str) -> None:
+        if dirname in self._dirs:
+            return
+        os.makedirs(dirname, exist_ok=True)
+        with self._lock:
+            self._dirs.add(dirname)
+
+    def write(self, stac_object: pystac.STACObject) -> str:
+        path = stac_object.get_self_href()
+        data = serialize_stac_object(stac_object)
+        self.make_dirs(os.path.dirname(path))
+        write_atomic(path, data)
+        return path
+
+
+# every run writes new files, so that a resumed run never appends to the truncated end of an interrupted one. The files
+# are synced every sync_every items or sync_interval seconds, and when no item is waiting, and the futures of the items
+# resolve once synced.
+class NDJSONWriter(BackgroundWriter):
+    def __init__(
+        self,
+        output_dir: str,
+        name: str,
+        shard_by: Callable[[pystac.Item], str] | None = None,
+        compression: str | None = None,
+        max_pending: int | None = None,
+        run_id: str | None = None,
+        sync_every: int = 1000,
+        sync_interval: float = 5.0,
+    ):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression {compression}.")
+        # unsynced items hold their slot, so there must be enough of them for a whole batch
+        super().__init__(1, max_pending or 2 * sync_every)
+        self.output_dir = output_dir
+        self.name = name
+        self.shard_by = shard_by
+        self.compression = compression
+        self.run_id = run_id or datetime.now(tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._files: dict[str, IO[bytes]] = {}
+        self._unsynced: list[tuple[Future, str]] = []
+        self._synced_at = time.monotonic()
+
+    def get_path(self, shard: str | None) -> str:
+        name = self.name if shard is None else f"{self.name}-{shard}"
+        return os.path.join(self.output_dir, f"{name}-{self.run_id}.ndjson{COMPRESSION_SUFFIXES[self.compression]}")
+
+    def write(self, stac_object: pystac.STACObject) -> str:
+        path = self.get_path(None if self.shard_by is None else self.shard_by(stac_object))
+        if path not in self._files:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._files[path] = open_compressed(path, self.compression)
+        self._files[path].write(dumps(stac_object.to_dict(include_self_link=False)) + b"\n")
+        return path
+
+    def written(self, future: Future, path: str) -> None:
+        self._unsynced.append((future, path))
+        if (
+            len(self._unsynced) >= self.sync_every
+            or self.is_idle()
+            or time.monotonic() - self._synced_at >= self.sync_interval
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        unsynced, self._unsynced = self._unsynced, []
+        self._synced_at = time.monotonic()
+        if not unsynced:
+            return
+        try:
+            for f in self._files.values():
+                sync_file(f)
+        except OSError as error:
+            for future, _ in unsynced:
+                future.set_exception(error)
+        else:
+            for future, path in unsynced:
+                future.set_result(path)
+
+    def close(self) -> None:
+        super().close()
+        self.sync()
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+def create_writer(
+    output_format: str = TREE_FORMAT,
+    num_threads: int = 4,
+    output_dir: str | None = None,
+    name: str | None = None,
+    shard_by: Callable[[pystac.Item], str] | None = None,
+    compression: str | None = None,
+) -> BackgroundWriter:
+    if output_format == TREE_FORMAT:
+        return ItemWriter(num_threads)
+    if output_format == NDJSON_FORMAT:
+        return NDJSONWriter(output_dir, name, shard_by, compression)
+    raise ValueError(f"Unknown output format {output_format}.")
@@ -1,22 +1,253 @@
-import json
 import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import cache
 from glob import glob
 
+import numpy as np
 import pytest
-from pystac.validation.stac_validator import JsonSchemaSTACValidator
+import rasterio as rio
+from rasterio.transform import from_origin
+
+from scripts.codec import load
+from scripts.schema_store import get_offline_stac_validator
+from scripts.validator import find_validation_error, get_stac_validator
+from scripts.writer import BackgroundWriter
+
+STAC_DIR = "stacs"
+STAC_VERSION = "1.0.0"
+# validation is only spread across processes when there are enough documents to pay for starting them
+VALIDATION_WORKERS = int(os.environ.get("STAC_TEST_WORKERS", os.cpu_count() or 1))
+MIN_PARALLEL_DOCUMENTS = 200
+CLC_FILES = [
+    "u2012_clc2012_v2020_20u1/DATA/U2012_CLC2012_V2020_20u1.tif",
+    "u2012_clc2012_v2020_20u1/DATA/U2012_CLC2012_V2020_20u1.tif.xml",
+    "u2012_clc2012_v2020_20u1/Documents/readme_U2012_CLC2012_V2020_20u1.txt",
+    "u2012_clc2012_v2020_20u1/Legend/CLC2012_CLC2012_V2018_20_QGIS.txt",
+    "u2012_clc2012_v2020_20u1/Legend/U2012_CLC2012_V2020_20u1.tif.lyr",
+    "u2018_clc2018_v2020_20u1/DATA/French_DOMs/U2018_CLC2018_V2020_20u1_FR_GLP.tif",
+    "u2018_clc2018_v2020_20u1/DATA/French_DOMs/U2018_CLC2018_V2020_20u1_FR_GLP.tif.xml",
+    "u2018_clc2018_v2020_20u1/DATA/French_DOMs/U2018_CLC2018_V2020_20u1_FR_MTQ.tif",
+    "u2018_clc2018_v2020_20u1/DATA/U2018_CLC2018_V2020_20u1.tfw",
+    "u2018_clc2018_v2020_20u1/DATA/U2018_CLC2018_V2020_20u1.tif",
+    "u2018_clc2018_v2020_20u1/DATA/U2018_CLC2018_V2020_20u1.tif.aux.xml",
+    "u2018_clc2018_v2020_20u1/DATA/U2018_CLC2018_V2020_20u1.tif.ovr",
+    "u2018_clc2018_v2020_20u1/DATA/U2018_CLC2018_V2020_20u1.tif.vat.cpg",
+    "u2018_clc2018_v2020_20u1/DATA/U2018_CLC2018_V2020_20u1.tif.vat.dbf",
+    "u2018_clc2018_v2020_20u1/DATA/U2018_CLC2018_V2020_20u1.tif.xml",
+    "u2018_clc2018_v2020_20u1/Documents/clc-country-coverage_v2020.pdf",
+    "u2018_clc2018_v2020_20u1/Documents/readme_U2018_CLC2018_V2020_20u1.txt",
+    "u2018_clc2018_v2020_20u1/Documents/readme_U2018_CLC2018_V2020_20u1_FR_GLP.txt",
+    "u2018_clc2018_v2020_20u1/French_DOMs/Legend/CLC_QGIS.txt",
+    "u2018_clc2018_v2020_20u1/French_DOMs/Legend/U2018_CLC2018_V2020_20u1_FR_GLP.tif.lyr",
+    "u2018_clc2018_v2020_20u1/French_DOMs/Legend/U2018_CLC2018_V2020_20u1_FR_MTQ.tif.lyr",
+    "u2018_clc2018_v2020_20u1/Legend/CLC2018_CLC2018_V2018_20_QGIS.txt",
+    "u2018_clc2018_v2020_20u1/Legend/U2018_CLC2018_V2020_20u1.tif.lyr",
+    "u2018_clc2018_v2020_20u1/Metadata/U2018_CLC2018_V2020_20u1.xml",
+    "u2018_clc2018_v2020_20u1/Metadata/U2018_CLC2018_V2020_20u1_FR_GLP.xml",
+]
+
+
+class StacCorpus:
+    """STAC documents of the samples, read once and indexed by type, collection id and extension."""
+
+    def __init__(self, stac_dir: str):
+        self.documents = {path: read_stac(path) for path in sorted(glob(f"{stac_dir}/**/*.json", recursive=True))}
+        self.ids = {path: os.path.relpath(path, stac_dir).removesuffix(".json") for path in self.documents}
+        self.by_type = defaultdict(list)
+        self.by_collection = defaultdict(list)
+        self.by_extension = defaultdict(list)
+        for path, stac_dict in self.documents.items():
+            self.by_type[stac_dict["type"]].append(path)
+            collection_id = stac_dict["id"] if stac_dict["type"] == "Collection" else stac_dict.get("collection")
+            if collection_id is not None:
+                self.by_collection[collection_id].append(path)
+            for extension_id in stac_dict.get("stac_extensions", []):
+                self.by_extension[extension_id].append(path)
+
+
+class MemoryWriter(BackgroundWriter):
+    """Keeps the saved objects as dicts by id, and fails to save the objects of `fail_ids` with `error`."""
+
+    def __init__(self, fail_ids=(), error=None):
+        super().__init__(1)
+        self.fail_ids = set(fail_ids)
+        self.error = error or OSError("No space left on device")
+        self.items = {}
+
+    def write(self, stac_object):
+        if stac_object.id in self.fail_ids:
+            raise self.error
+        self.items[stac_object.id] = stac_object.to_dict()
+        return stac_object.get_self_href()
+
+
+class StubClientPool:
+    """Hands out a client that fails any request, so only tiles in the tile grid can be built."""
+
+    rio_session = None
+    size = 3
+
+    @contextmanager
+    def client(self):
+        yield None
+
+
+@cache
+def get_corpus() -> StacCorpus:
+    return StacCorpus(STAC_DIR)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "stac_extensions(*extension_ids): run once per document using an extension")
+    config.addinivalue_line("markers", "stac_products(product_schemas): run once per document of a product")
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize tests taking `stac_path` with one case per document, so that each document fails on its own."""
+    if "stac_path" not in metafunc.fixturenames:
+        return
+    corpus = get_corpus()
+    if marker := metafunc.definition.get_closest_marker("stac_extensions"):
+        argnames = ("stac_path", "extension_id")
+        params = [
+            pytest.param(path, extension_id, id=f"{extension_id.split('/')[-3]}:{corpus.ids[path]}")
+            for extension_id in marker.args
+            for path in corpus.by_extension[extension_id]
+        ]
+    elif marker := metafunc.definition.get_closest_marker("stac_products"):
+        argnames = ("stac_path", "product_schema")
+        params = [
+            pytest.param(
+                path,
+                product_schema,
+                id=corpus.ids[path],
+                marks=() if product_schema else pytest.mark.skip(reason="Schema not available"),
+            )
+            for product_id, product_schema in marker.args[0].items()
+            for path in corpus.by_collection[product_id]
+        ]
+    else:
+        argnames = "stac_path"
+        params = [pytest.param(path, id=corpus.ids[path]) for path in corpus.documents]
+    metafunc.parametrize(argnames, params)
+
+
+def validate_core(path: str) -> str | None:
+    stac_dict = get_corpus().documents[path]
+    try:
+        get_validator().validate_core(stac_dict, stac_dict["type"], STAC_VERSION)
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+    return None
+
+
+def validate_extension(path: str, extension_id: str) -> str | None:
+    stac_dict = get_corpus().documents[path]
+    try:
+        get_validator().validate_extension(stac_dict, stac_dict["type"], STAC_VERSION, extension_id)
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+    return None
+
+
+def validate_product(path: str, product_schema: str) -> str | None:
+    error = find_validation_error(get_stac_validator(product_schema), get_corpus().documents[path])
+    return None if error is None else error.message
+
+
+@cache
+def get_validator():
+    return get_offline_stac_validator()
+
+
+def run_validation(function, cases: list[tuple]) -> dict[tuple, str | None]:
+    """Validate documents, in worker processes when there are many of them, and map each case to its error."""
+    args = list(zip(*cases, strict=True))
+    if VALIDATION_WORKERS <= 1 or len(cases) < MIN_PARALLEL_DOCUMENTS:
+        return dict(zip(cases, map(function, *args), strict=True))
+    with ProcessPoolExecutor(VALIDATION_WORKERS) as executor:
+        chunksize = max(1, len(cases) // (VALIDATION_WORKERS * 4))
+        return dict(zip(cases, executor.map(function, *args, chunksize=chunksize), strict=True))
 
 
 @pytest.fixture(scope="session")
-def stac_fixture():
-    stac_list = glob("stacs/**/*.json", recursive=True)
-    return [(os.path.split(stac)[-1].split(".")[0], read_stac(stac)) for stac in stac_list]
+def stac_corpus():
+    return get_corpus()
 
 
 @pytest.fixture(scope="session")
-def validator_fixture():
-    return JsonSchemaSTACValidator()
+def stac_fixture(stac_corpus):
+    return [(os.path.split(path)[-1].split(".")[0], stac_dict) for path, stac_dict in stac_corpus.documents.items()]
+
+
+@pytest.fixture()
+def memory_writer():
+    return MemoryWriter
+
+
+@pytest.fixture()
+def stub_client_pool():
+    return StubClientPool()
+
+
+@pytest.fixture()
+def clc_data_root(tmp_path):
+    """A CLC data folder with the layout of the delivered one, with small rasters and empty other files."""
+    data = np.zeros((1, 64, 64), dtype="uint8")
+    data[0, 8:56, 4:60] = 1
+    for file in CLC_FILES:
+        path = tmp_path / "clc" / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not file.endswith(".tif"):
+            path.touch()
+            continue
+        with rio.open(
+            path,
+            "w",
+            driver="GTiff",
+            height=64,
+            width=64,
+            count=1,
+            dtype="uint8",
+            crs="EPSG:3035",
+            transform=from_origin(4000000, 3000000, 100, 100),
+            nodata=0,
+        ) as dst:
+            dst.write(data)
+    return str(tmp_path / "clc")
+
+
+@pytest.fixture(scope="session")
+def core_errors(request):
+    return run_validation(validate_core, get_selected_cases(request.session, "core_errors", ("stac_path",)))
+
+
+@pytest.fixture(scope="session")
+def extension_errors(request):
+    cases = get_selected_cases(request.session, "extension_errors", ("stac_path", "extension_id"))
+    return run_validation(validate_extension, cases)
+
+
+@pytest.fixture(scope="session")
+def product_errors(request):
+    cases = get_selected_cases(request.session, "product_errors", ("stac_path", "product_schema"))
+    return run_validation(validate_product, cases)
+
+
+def get_selected_cases(session: pytest.Session, fixture_name: str, argnames: tuple[str, ...]) -> list[tuple]:
+    """Return the parameters of the selected, not skipped tests using a validation results fixture."""
+    return sorted(
+        {
+            tuple(item.callspec.params[argname] for argname in argnames)
+            for item in session.items
+            if fixture_name in getattr(item, "fixturenames", ())
+            and hasattr(item, "callspec")
+            and item.get_closest_marker("skip") is None
+        }
+    )
 
 
 def read_stac(path):
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
+    return load(path)
@@ -0,0 +1,50 @@
+import os
+from glob import glob
+
+import pystac
+
+from scripts.assembler import ItemSummaryLog, get_proj_epsg, link_item_summaries, link_items, read_item_summaries
+
+ITEM_PATHS = sorted(glob("stacs/corine-land-cover/*/*.json"))
+
+
+def test_link_items():
+    """Items are linked by href and their extent, EPSG codes and asset keys are folded."""
+    links, fold = link_items(ITEM_PATHS)
+
+    items = [pystac.Item.from_file(path) for path in ITEM_PATHS]
+    assert [link.href for link in links] == ITEM_PATHS
+    assert fold.count == len(items)
+    assert fold.bbox == [
+        min(item.bbox[0] for item in items),
+        min(item.bbox[1] for item in items),
+        max(item.bbox[2] for item in items),
+        max(item.bbox[3] for item in items),
+    ]
+    assert fold.start_datetime == min(item.common_metadata.start_datetime or item.datetime for item in items)
+    assert fold.epsg == {get_proj_epsg(item.to_dict()) for item in items}
+    assert fold.assets == {key for item in items for key in item.assets}
+    extent = pystac.Extent(pystac.SpatialExtent([[-180, -90, 180, 90]]), pystac.TemporalExtent([[None, None]]))
+    assert fold.check(extent) == []
+
+
+def test_item_summary_log(tmp_path):
+    """Collections assembled from the summary log match those of the item files.
+
+    The last record of an item is kept, and records of deleted items and a truncated last record are skipped.
+    """
+    path = str(tmp_path / "items.jsonl")
+    with ItemSummaryLog(path) as summary_log:
+        for item_path in [*ITEM_PATHS, ITEM_PATHS[0]]:
+            summary_log.record(pystac.Item.from_file(item_path))
+        deleted_item = pystac.Item.from_file(ITEM_PATHS[0])
+        deleted_item.id = "deleted"
+        deleted_item.set_self_href(str(tmp_path / "deleted.json"))
+        summary_log.record(deleted_item)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "interrupted", "hr')
+
+    links, fold = link_item_summaries(read_item_summaries(path))
+    expected_links, expected_fold = link_items([os.path.abspath(item_path) for item_path in ITEM_PATHS])
+    assert [link.to_dict() for link in links] == [link.to_dict() for link in expected_links]
+    assert vars(fold) == vars(expected_fold)
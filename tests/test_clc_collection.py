@@ -0,0 +1,26 @@
+import pystac
+
+from scripts.clc.collection import populate_collection
+from scripts.clc.constants import COLLECTION_ID
+
+
+def create_collection(path):
+    extent = pystac.Extent(pystac.SpatialExtent([[0, 0, 0, 0]]), pystac.TemporalExtent([[None, None]]))
+    collection = pystac.Collection(COLLECTION_ID, "CORINE Land Cover Raster", extent)
+    collection.set_self_href(str(path))
+    return collection
+
+
+def test_populate_collection_in_processes(tmp_path, clc_data_root, memory_writer):
+    """Items created in worker processes are the same, and added in the same order, as created serially."""
+    results = []
+    for workers in (1, 2):
+        collection = create_collection(tmp_path / "collection.json")
+        with memory_writer() as writer:
+            populate_collection(collection, clc_data_root, max_workers=workers, writer=writer)
+        results.append((writer.items, collection.to_dict()))
+
+    (serial_items, serial_collection), (parallel_items, parallel_collection) = results
+    assert len(serial_items) == 4
+    assert list(parallel_items.items()) == list(serial_items.items())
+    assert parallel_collection == serial_collection
@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pytest
+import rasterio as rio
+import rasterio.warp
+from rasterio.transform import from_origin
+
+from scripts.clc.item import (
+    deconstruct_clc_name,
+    get_img_paths,
+    get_item_asset_files,
+    index_asset_files,
+    project_data_window_bbox,
+)
+
+WGS84 = rio.CRS.from_epsg(4326)
+RASTERS = {
+    "centre": ("EPSG:3035", (4000000, 4000000), 250, (1200, 1000), [(200, 880, 120, 800)]),
+    "north-west": ("EPSG:3035", (2600000, 5400000), 250, (1600, 2000), [(400, 1240, 280, 1720)]),
+    "patches": ("EPSG:3035", (4000000, 4000000), 250, (2000, 2000), [(10, 30, 10, 30), (1500, 1990, 1000, 1999)]),
+    "utm": ("EPSG:32633", (300000, 6000000), 250, (1200, 1200), [(49, 1151, 18, 1200)]),
+    "full": ("EPSG:3035", (3000000, 3500000), 250, (800, 1200), [(0, 800, 0, 1200)]),
+}
+
+
+def walk_item_asset_files(data_root, img_path):
+    """The asset files of an image as found before, by walking the data folder for every image."""
+    clc_name_elements = deconstruct_clc_name(img_path)
+    clc_id = clc_name_elements["id"]
+    dom_code = clc_name_elements["DOM_code"]
+    campaign = "U{update_campaign}_{theme}{reference_year}_V{release_year}".format(**clc_name_elements).lower()
+    asset_files = []
+    for root, _, files in os.walk(data_root):
+        if not dom_code and "French_DOMs" in root:
+            continue
+        if dom_code and "Legend" in root and "French_DOMs" not in root:
+            continue
+        if campaign not in root:
+            continue
+        for file in files:
+            if (
+                file.startswith(f"{clc_id}.")
+                or file.endswith((f"{dom_code}.tif.lyr", "QGIS.txt"))
+                or file == f"readme_{clc_id}.txt"
+            ):
+                asset_files.append(os.path.join(root, file))
+    return asset_files
+
+
+def test_get_item_asset_files(clc_data_root):
+    """Assets are looked up in the index in the order walking the data folder finds them."""
+    file_index = index_asset_files(clc_data_root)
+    img_paths = get_img_paths(clc_data_root)
+    assert len(img_paths) == 4
+    for img_path in img_paths:
+        asset_files = get_item_asset_files(clc_data_root, img_path, file_index)
+        assert asset_files
+        assert asset_files == walk_item_asset_files(clc_data_root, img_path)
+
+
+def project_data_window_bbox_in_memory(src, dst_crs, dst_resolution=(0.25, 0.25)):
+    """The footprint as computed before, by reprojecting the whole raster read into memory."""
+    data, transform = rio.warp.reproject(
+        source=src.read(),
+        src_transform=src.transform,
+        src_crs=src.crs,
+        dst_crs=dst_crs,
+        dst_nodata=src.nodata,
+        dst_resolution=dst_resolution,
+        resampling=rio.warp.Resampling.max,
+    )
+    data_window = rio.windows.get_data_window(data, nodata=src.nodata)
+    return rio.windows.bounds(data_window, transform=transform)
+
+
+def write_raster(path, crs, origin, resolution, shape, blocks, dtype, nodata):
+    data = np.full((1, *shape), nodata, dtype=dtype)
+    for row_start, row_stop, col_start, col_stop in blocks:
+        data[0, row_start:row_stop, col_start:col_stop] = 1
+    with rio.open(
+        path,
+        "w",
+        driver="GTiff",
+        height=shape[0],
+        width=shape[1],
+        count=1,
+        dtype=dtype,
+        crs=crs,
+        transform=from_origin(*origin, resolution, resolution),
+        nodata=nodata,
+        tiled=True,
+        blockxsize=256,
+        blockysize=256,
+    ) as dst:
+        dst.write(data)
+
+
+@pytest.mark.parametrize(("dtype", "nodata"), [("uint8", 0), ("int8", -128)])
+@pytest.mark.parametrize("raster", RASTERS)
+def test_project_data_window_bbox(tmp_path, raster, dtype, nodata):
+    """The footprint matches the one of the whole raster reprojected in memory."""
+    path = str(tmp_path / f"{raster}.tif")
+    write_raster(path, *RASTERS[raster], dtype, nodata)
+    with rio.open(path) as src:
+        assert project_data_window_bbox(src, WGS84) == project_data_window_bbox_in_memory(src, WGS84)
@@ -0,0 +1,26 @@
+from glob import glob
+
+import pystac
+import pytest
+
+from scripts import codec
+
+ITEM_PATHS = sorted(glob("stacs/*/*/*.json"))
+
+
+@pytest.mark.skipif(codec.orjson is None, reason="orjson not installed")
+def test_backends_write_the_same_bytes(monkeypatch):
+    """Both backends serialize items to the same bytes, indented as pystac saves them, and read them back alike."""
+    outputs = {}
+    for backend in (codec.ORJSON_BACKEND, codec.STDLIB_BACKEND):
+        monkeypatch.setattr(codec, "BACKEND", backend)
+        stac_dicts = [codec.load(path) for path in ITEM_PATHS]
+        outputs[backend] = [
+            codec.dumps(stac_dict, indent=indent) for stac_dict in stac_dicts for indent in (False, True)
+        ]
+    assert outputs[codec.ORJSON_BACKEND] == outputs[codec.STDLIB_BACKEND]
+
+
+def test_stac_io_roundtrip():
+    item = pystac.Item.from_file(ITEM_PATHS[0], stac_io=codec.CodecStacIO())
+    assert codec.loads(codec.CodecStacIO().json_dumps(item.to_dict())) == item.to_dict()
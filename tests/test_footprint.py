@@ -0,0 +1,23 @@
+import numpy as np
+from rasterio.warp import transform_bounds as rasterio_transform_bounds
+
+from scripts.footprint import get_footprints, transform_bounds
+
+TILE_BOUNDS = {
+    32632: [(600000, 5390220, 709800, 5500020), (699960, 5490240, 809760, 5600040)],
+    32740: [(499980, 7690240, 609780, 7800040)],
+    3035: [(5101000, 2010000, 5160000, 2060000)],
+}
+
+
+def test_transform_bounds():
+    """A batch of bounds is transformed as rasterio transforms each of them."""
+    for epsg, bounds in TILE_BOUNDS.items():
+        expected = [rasterio_transform_bounds(epsg, 4326, *tile_bounds) for tile_bounds in bounds]
+        np.testing.assert_allclose(transform_bounds(bounds, epsg), expected, rtol=0, atol=1e-8)
+
+
+def test_get_footprints():
+    bounds = TILE_BOUNDS[32632]
+    footprints = get_footprints(bounds, 32632)
+    assert [footprint.bounds for footprint in footprints] == [tuple(row) for row in transform_bounds(bounds, 32632)]
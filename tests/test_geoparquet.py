@@ -0,0 +1,51 @@
+import json
+from datetime import datetime
+
+import pytest
+from shapely import from_wkb
+from shapely.geometry import shape
+
+from scripts.geoparquet import DATETIME_PROPERTIES, export_geoparquet, iter_items
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def drop_nulls(value):
+    """Remove the struct fields the items do not have, filled with nulls in the columns."""
+    if isinstance(value, dict):
+        return {key: drop_nulls(child) for key, child in value.items() if child is not None}
+    if isinstance(value, list):
+        return [drop_nulls(child) for child in value]
+    return value
+
+
+def test_export_geoparquet(tmp_path):
+    """Items of a STAC tree and of an NDJSON file are exported in the stac-geoparquet layout."""
+    items = list(iter_items(["stacs"]))
+    ndjson_path = tmp_path / "items.ndjson"
+    ndjson_path.write_text("".join(json.dumps(item) + "\n" for item in items[:3]))
+
+    output_path = str(tmp_path / "items.parquet")
+    assert export_geoparquet(["stacs", str(ndjson_path)], output_path, row_group_size=4) == len(items) + 3
+
+    parquet_file = pq.ParquetFile(output_path)
+    assert parquet_file.metadata.num_row_groups == -(-(len(items) + 3) // 4)
+    table = parquet_file.read()
+    geo = json.loads(table.schema.metadata[b"geo"])
+    assert geo["primary_column"] == "geometry"
+    assert geo["columns"]["geometry"]["encoding"] == "WKB"
+    assert json.loads(table.schema.metadata[b"stac-geoparquet"]) == {"version": "1.0.0"}
+    assert str(table.schema.field("start_datetime").type) == "timestamp[us, tz=UTC]"
+    assert str(table.schema.field("proj:epsg").type) == "int32"
+    rows = table.to_pylist()
+    for item, row in zip(items, rows, strict=False):
+        assert row["id"] == item["id"]
+        assert from_wkb(row["geometry"]).equals(shape(item["geometry"]))
+        assert [row["bbox"][key] for key in ("xmin", "ymin", "xmax", "ymax")] == item["bbox"]
+        assert drop_nulls(row["assets"]) == item["assets"]
+        assert drop_nulls(row["links"]) == item["links"]
+        for name, value in item["properties"].items():
+            if name in DATETIME_PROPERTIES:
+                assert row[name] == (value and datetime.fromisoformat(value))
+            else:
+                assert row[name] == value
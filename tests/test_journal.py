@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+
+from scripts.journal import ProgressJournal
+
+LAST_MODIFIED = datetime(2023, 4, 8, 1, 47, 59, tzinfo=timezone.utc)
+
+
+def test_journal_resume(tmp_path):
+    path = str(tmp_path / "progress.journal")
+    with ProgressJournal(path) as journal:
+        journal.mark_done("VPP_2022_S2_T40KCC-", "etag-1", LAST_MODIFIED)
+        journal.mark_failed("VPP_2022_S2_T40KCD-", "Failed to create item.")
+        journal.mark_done("VPP_2022_S2_T40KCE-")
+        journal.mark_failed("VPP_2022_S2_T40KCE-", "Failed to save item.")
+    with ProgressJournal(path) as journal:
+        assert journal.is_done("VPP_2022_S2_T40KCC-", "etag-1", LAST_MODIFIED)
+        assert not journal.is_done("VPP_2022_S2_T40KCC-", "etag-2")
+        assert not journal.is_done("VPP_2022_S2_T40KCD-")
+        assert not journal.is_done("VPP_2022_S2_T40KCE-")
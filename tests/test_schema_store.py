@@ -0,0 +1,79 @@
+import io
+import json
+import os
+
+import pystac
+import pytest
+from pystac.validation.stac_validator import GetSchemaError
+
+import refresh_schema_store
+from scripts.schema_store import (
+    STORE_SCHEMA_URIS,
+    get_offline_stac_validator,
+    get_schema_path,
+    get_schema_uri,
+    load_schema_store,
+)
+
+
+def test_schema_path():
+    """Schemas are stored under the host and path of their URI."""
+    uri = "https://schemas.stacspec.org/v1.0.0/item-spec/json-schema/item.json"
+    assert get_schema_uri(get_schema_path(uri, "store"), "store") == uri
+
+
+@pytest.fixture()
+def fetched_uris(monkeypatch):
+    """URIs the validator fails to fetch. The class is patched, as `StacIO.default` returns a new instance per call."""
+    uris = []
+
+    def read_text(_stac_io, source, *_args, **_kwargs):
+        uris.append(str(source))
+        raise AssertionError(f"{source} fetched from the network")
+
+    monkeypatch.setattr(pystac.stac_io.DefaultStacIO, "read_text", read_text)
+    return uris
+
+
+def test_offline_validation(stac_fixture, fetched_uris):
+    """Core validation reads every schema from the store."""
+    validator = get_offline_stac_validator()
+    for _, stac_dict in stac_fixture:
+        assert validator.validate_core(stac_dict, stac_dict["type"], "1.0.0")
+    assert fetched_uris == []
+
+
+def test_offline_extension_validation(stac_corpus, fetched_uris):
+    """Extension validation reads the extension schemas, and the schemas they reference, from the store."""
+    extension_ids = [uri for uri in STORE_SCHEMA_URIS if uri.startswith("https://stac-extensions.github.io/")]
+    if missing := [uri for uri in extension_ids if not os.path.exists(get_schema_path(uri))]:
+        pytest.skip(f"{', '.join(missing)} not in the store, run refresh_schema_store.py to add them")
+    validator = get_offline_stac_validator()
+    for extension_id in extension_ids:
+        assert stac_corpus.by_extension[extension_id]
+        for path in stac_corpus.by_extension[extension_id]:
+            stac_dict = stac_corpus.documents[path]
+            assert validator.validate_extension(stac_dict, stac_dict["type"], "1.0.0", extension_id)
+    assert fetched_uris == []
+
+
+def test_network_is_blocked(fetched_uris):
+    """The fixture catches fetches of schemas missing from the store."""
+    validator = get_offline_stac_validator()
+    with pytest.raises(GetSchemaError):
+        validator.validate_extension({}, pystac.STACObjectType.ITEM, "1.0.0", "https://example.com/schema.json")
+    assert fetched_uris == ["https://example.com/schema.json"]
+
+
+def test_refresh_schema_store(tmp_path, monkeypatch):
+    """Referenced schemas are downloaded with the schemas they are referenced from."""
+    responses = {
+        "https://example.com/a/schema.json": {"$ref": "../b/schema.json#/definitions/b"},
+        "https://example.com/b/schema.json": {"definitions": {"b": {"$ref": "http://json-schema.org/draft-07/schema"}}},
+    }
+    monkeypatch.setattr(refresh_schema_store, "STORE_SCHEMA_URIS", ["https://example.com/a/schema.json"])
+    monkeypatch.setattr(
+        refresh_schema_store, "urlopen", lambda uri, **_kwargs: io.BytesIO(json.dumps(responses[uri]).encode())
+    )
+    refresh_schema_store.refresh_schema_store(str(tmp_path))
+    assert load_schema_store(str(tmp_path)) == responses
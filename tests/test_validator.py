@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from jsonschema.exceptions import best_match
+
+from scripts.validator import COMPILED_BACKEND, SampledValidator, find_validation_error, get_stac_validator
+
+
+def test_validator_is_cached():
+    """The schema of a product is loaded once and the validator shared by all threads."""
+    with ThreadPoolExecutor(8) as executor:
+        validators = list(executor.map(get_stac_validator, ["schema/products/vpp.json"] * 16))
+    assert all(validator is validators[0] for validator in validators)
+    assert get_stac_validator("./schema/products/vpp.json") is validators[0]
+    assert get_stac_validator("schema/products/clc.json") is not validators[0]
+
+
+def test_find_validation_error(stac_fixture):
+    """Valid documents pass the boolean check, invalid ones get the same error as a full best_match."""
+    validator = get_stac_validator("schema/products/vpp.json")
+    items = [
+        stac_dict
+        for _, stac_dict in stac_fixture
+        if stac_dict.get("collection") == "vegetation-phenology-and-productivity"
+    ]
+    assert items
+    for stac_dict in items:
+        assert find_validation_error(validator, stac_dict) is None
+        invalid = {**stac_dict, "properties": {**stac_dict["properties"], "start_datetime": "yesterday"}}
+        error = find_validation_error(validator, invalid)
+        assert error is not None
+        assert error.message == best_match(validator.iter_errors(invalid)).message
+
+
+def test_sampled_validator():
+    """Only one in `every` documents is checked."""
+    validator = SampledValidator(get_stac_validator("schema/products/vpp.json"), every=3)
+    results = [find_validation_error(validator, {}) for _ in range(6)]
+    assert [error is None for error in results] == [False, True, True, False, True, True]
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda stac_dict: stac_dict,
+        lambda stac_dict: {**stac_dict, "id": 1},
+        lambda stac_dict: {key: value for key, value in stac_dict.items() if key != "links"},
+        lambda stac_dict: {**stac_dict, "stac_extensions": []},
+        lambda stac_dict: {**stac_dict, "assets": {}},
+    ],
+)
+def test_compiled_backend(stac_fixture, mutate):
+    """The compiled backend accepts and rejects the same documents and reports the same errors."""
+    pytest.importorskip("fastjsonschema")
+    for product_id, product_schema in [
+        ("corine-land-cover-raster", "schema/products/clc.json"),
+        ("vegetation-phenology-and-productivity", "schema/products/vpp.json"),
+        ("urban-atlas-building-height", "schema/products/uabh.json"),
+    ]:
+        validator = get_stac_validator(product_schema)
+        compiled_validator = get_stac_validator(product_schema, backend=COMPILED_BACKEND)
+        for _, stac_dict in stac_fixture:
+            if product_id not in (stac_dict["id"], stac_dict.get("collection")):
+                continue
+            document = mutate(stac_dict)
+            assert compiled_validator.is_valid(document) == validator.is_valid(document)
+            error = find_validation_error(validator, document)
+            compiled_error = find_validation_error(compiled_validator, document)
+            assert (error and error.message) == (compiled_error and compiled_error.message)
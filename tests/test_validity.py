@@ -1,86 +1,62 @@
-import json
+import os
 
-import jsonschema
 import pytest
-from jsonschema.exceptions import best_match
-from referencing import Registry, Resource
 
 STAC_VERSION = "1.0.0"
 PROJECT_ID = "https://stac-extensions.github.io/projection/v1.1.0/schema.json"
 ITEM_ASSETS_ID = "https://stac-extensions.github.io/item-assets/v1.0.0/schema.json"
 RASTER_BANDS_ID = "https://stac-extensions.github.io/raster/v1.1.0/schema.json"
-
-
-def test_core(stac_fixture, validator_fixture, stac_version="1.0.0"):
+# products without a schema are skipped
+PRODUCT_SCHEMAS = {
+    "corine-land-cover-raster": "schema/products/clc.json",
+    "vegetation-phenology-and-productivity": "schema/products/vpp.json",
+    "river-and-lake-ice-extent-s2": "schema/products/rlie-s2.json",
+    "corine-land-cover-plus-raster": "schema/products/clcplus.json",
+    "imperviousness-built-up-10m": "schema/products/ibu10m.json",
+    "imperviousness-change-20m": None,
+    "natura2000": "schema/products/n2k.json",
+    "urban-atlas-building-height": "schema/products/uabh.json",
+    "urban-atlas-street-tree-layer": None,
+    "eu-hydro": "schema/products/eu-hydro.json",
+}
+
+
+def test_core(stac_path, core_errors):
     """Validate a core stac object."""
-    for _, stac_dict in stac_fixture:
-        assert validator_fixture.validate_core(stac_dict, stac_dict["type"], stac_version), f"{stac_dict.id} is invalid"
+    error = core_errors[(stac_path,)]
+    assert error is None, f"{stac_path} is invalid. Reason: {error}"
 
 
-@pytest.mark.parametrize("extension_id", [PROJECT_ID, ITEM_ASSETS_ID])
-def test_extensions(stac_fixture, validator_fixture, extension_id, stac_version=STAC_VERSION):
+@pytest.mark.stac_extensions(PROJECT_ID, ITEM_ASSETS_ID)
+def test_extensions(stac_path, extension_id, extension_errors):
     """Validate stac extensions."""
-    for _, stac_dict in stac_fixture:
-        if "stac_extensions" in stac_dict and extension_id in stac_dict["stac_extensions"]:
-            validator_fixture.validate_extension(stac_dict, stac_dict["type"], stac_version, extension_id)
+    error = extension_errors[(stac_path, extension_id)]
+    assert error is None, f"{stac_path} is invalid against {extension_id}. Reason: {error}"
 
 
-@pytest.mark.parametrize(
-    ("product_id", "product_schema"),
-    [
-        ("corine-land-cover-raster", "schema/products/clc.json"),
-        ("vegetation-phenology-and-productivity", "schema/products/vpp.json"),
-        ("river-and-lake-ice-extent-s2", "schema/products/rlie-s2.json"),
-        ("corine-land-cover-plus-raster", "schema/products/clcplus.json"),
-        ("imperviousness-built-up-10m", "schema/products/ibu10m.json"),
-        pytest.param(
-            "imperviousness-change-20m",
-            "schema/products/imc.json",
-            marks=pytest.mark.skip(reason="Schema not available"),
-        ),
-        ("natura2000", "schema/products/n2k.json"),
-        ("urban-atlas-building-height", "schema/products/uabh.json"),
-        pytest.param(
-            "urban-atlas-street-tree-layer",
-            "schema/products/uastl.json",
-            marks=pytest.mark.skip(reason="Schema not available"),
-        ),
-        ("eu-hydro", "schema/products/eu-hydro.json"),
-    ],
-)
-def test_products(stac_fixture, product_id, product_schema):
+@pytest.mark.stac_products(PRODUCT_SCHEMAS)
+def test_products(stac_path, product_schema, product_errors):
     """Validate stac items and collections against corresponding prodcut schemas."""
-    with open(product_schema, encoding="utf-8") as f:
-        schema = json.load(f)
-    registry = Registry().with_resources(
-        [("http://example.com/schema.json", Resource.from_contents(schema))],
-    )
-    validator = jsonschema.Draft7Validator({"$ref": "http://example.com/schema.json"}, registry=registry)
-    for _, stac_dict in stac_fixture:
-        is_collection = stac_dict["type"] == "Collection" and stac_dict["id"] == product_id
-        is_item = stac_dict["type"] == "Feature" and stac_dict["collection"] == product_id
-        if is_collection or is_item:
-            error = best_match(validator.iter_errors(stac_dict))
-            assert error is None, f"{stac_dict['id']} is invalid. Reason: {error.message}"
+    error = product_errors[(stac_path, product_schema)]
+    assert error is None, f"{stac_path} is invalid. Reason: {error}"
 
 
-def test_stac_id(stac_fixture):
+def test_stac_id(stac_path, stac_corpus):
     """Ensure that stac id and stac filename are the same."""
-    for stac_filename, stac_dict in stac_fixture:
-        assert (
-            stac_filename == stac_dict["id"]
-        ), f"STAC filename: {stac_filename} does not match STAC id: {stac_dict['id']}"
+    stac_filename = os.path.split(stac_path)[-1].split(".")[0]
+    stac_dict = stac_corpus.documents[stac_path]
+    assert stac_filename == stac_dict["id"], f"STAC filename: {stac_filename} does not match STAC id: {stac_dict['id']}"
 
 
-def test_item_collection_relationship(stac_fixture):
+def test_item_collection_relationship(stac_path, stac_corpus):
     """Ensure that stac item linked to its corresponding stac collection."""
-    for stac_filename, stac_dict in stac_fixture:
-        if "collection" in stac_dict:
-            parent_and_collection = [
-                link["href"].split("/")[-1].split(".")[0]
-                for link in stac_dict["links"]
-                if link["rel"] == "parent" or link["rel"] == "collection"
-            ]
-            assert (
-                stac_dict["collection"] == parent_and_collection[0] == parent_and_collection[1]
-            ), f"The collection field of {stac_filename} does not match parent/collection href"
+    stac_dict = stac_corpus.documents[stac_path]
+    if "collection" in stac_dict:
+        parent_and_collection = [
+            link["href"].split("/")[-1].split(".")[0]
+            for link in stac_dict["links"]
+            if link["rel"] == "parent" or link["rel"] == "collection"
+        ]
+        assert (
+            stac_dict["collection"] == parent_and_collection[0] == parent_and_collection[1]
+        ), f"The collection field of {stac_path} does not match parent/collection href"
@@ -0,0 +1,36 @@
+import boto3
+import pytest
+
+from scripts.vpp.client_pool import S3ClientPool
+
+
+def create_pool(size):
+    aws_session = boto3.Session(aws_access_key_id="key", aws_secret_access_key="secret", region_name="eu-central-1")
+    return S3ClientPool(aws_session, size=size)
+
+
+def test_clients_are_reused():
+    """The same clients are handed out again once returned."""
+    pool = create_pool(2)
+    clients = []
+    for _ in range(4):
+        with pool.client() as client:
+            clients.append(client)
+    assert len({id(client) for client in clients}) == 2
+    assert pool.rio_session.credentials["aws_access_key_id"] == "key"
+
+
+def test_client_returned_after_error():
+    """A client is returned to the pool when the block using it raises."""
+    pool = create_pool(1)
+    with pytest.raises(KeyError), pool.client():
+        raise KeyError("tile")
+    with pool.client() as client:
+        assert client is not None
+
+
+def test_exhausted_pool_raises():
+    """Taking a client from an exhausted pool fails instead of blocking."""
+    pool = create_pool(1)
+    with pool.client(), pytest.raises(RuntimeError, match="All 1 S3 clients are in use"), pool.client():
+        pass
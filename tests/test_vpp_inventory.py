@@ -0,0 +1,78 @@
+import csv
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from scripts.vpp.inventory import InventoryError, read_inventory
+
+PREFIX = "CLMS/Pan-European/Biophysical/VPP/v01/2022/s2/"
+ROWS = [
+    ("HRVPP", f"{PREFIX}VPP_2022_S2_T40KCC-010m_V105_s2_AMPL.tif", "1024", "2023-04-08T01:47:59.000Z", "etag-1"),
+    ("HRVPP", f"{PREFIX}VPP_2022_S2_T40KCC-010m_V105_s2_EOSD.tif", "2048", "2023-04-08T01:48:10.000Z", "etag-2"),
+]
+COLUMNAR_SCHEMAS = {
+    "Parquet": (
+        "message s3.inventory { required binary bucket (STRING); required binary key (STRING); optional int64 size;"
+        " optional int64 last_modified_date (TIMESTAMP(MILLIS,true)); optional binary e_tag (STRING);}"
+    ),
+    "ORC": "struct<bucket:string,key:string,size:bigint,last_modified_date:timestamp,e_tag:string>",
+}
+DATA_KEY = "HRVPP/vpp-inventory/data/part-0"
+
+
+def write_inventory(root, file_format="CSV", file_schema="Bucket, Key, Size, LastModifiedDate, ETag"):
+    (root / "HRVPP/vpp-inventory/data").mkdir(parents=True)
+    if file_format == "CSV":
+        with gzip.open(root / DATA_KEY, "wt", newline="") as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+            for bucket, key, size, last_modified, etag in ROWS:
+                writer.writerow([bucket, key.replace("/", "%2F"), size, last_modified, etag])
+    manifest_dir = root / "HRVPP/vpp-inventory/2023-05-01T01-00Z"
+    manifest_dir.mkdir(parents=True)
+    manifest = {
+        "sourceBucket": "HRVPP",
+        "destinationBucket": "arn:aws:s3:::inventory",
+        "fileFormat": file_format,
+        "fileSchema": file_schema,
+        "files": [{"key": DATA_KEY, "size": 0, "MD5checksum": ""}],
+    }
+    (manifest_dir / "manifest.json").write_text(json.dumps(manifest))
+    return str(manifest_dir / "manifest.json")
+
+
+def test_read_csv_inventory(tmp_path):
+    objects = list(read_inventory(write_inventory(tmp_path)))
+    assert [obj["Key"] for obj in objects] == [row[1] for row in ROWS]
+    assert objects[0]["Size"] == 1024
+    assert objects[0]["ETag"] == "etag-1"
+    assert objects[0]["LastModified"] == datetime(2023, 4, 8, 1, 47, 59, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("file_format", ["Parquet", "ORC"])
+def test_read_columnar_inventory(tmp_path, file_format):
+    pyarrow = pytest.importorskip("pyarrow")
+    table = pyarrow.table(
+        {
+            "bucket": [row[0] for row in ROWS],
+            "key": [row[1] for row in ROWS],
+            "size": [int(row[2]) for row in ROWS],
+            "last_modified_date": [datetime.fromisoformat(row[3].replace("Z", "")) for row in ROWS],
+            "e_tag": [row[4] for row in ROWS],
+        }
+    )
+    manifest_path = write_inventory(tmp_path, file_format, COLUMNAR_SCHEMAS[file_format])
+    data_path = str(tmp_path / DATA_KEY)
+    if file_format == "Parquet":
+        pytest.importorskip("pyarrow.parquet").write_table(table, data_path)
+    else:
+        pytest.importorskip("pyarrow.orc").write_table(table, data_path)
+
+    objects = list(read_inventory(manifest_path))
+    assert objects == list(read_inventory(write_inventory(tmp_path / "csv")))
+
+
+def test_read_inventory_missing_columns(tmp_path):
+    with pytest.raises(InventoryError):
+        list(read_inventory(write_inventory(tmp_path, file_schema="Bucket, Key, Size")))
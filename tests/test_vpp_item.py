@@ -0,0 +1,140 @@
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import numpy as np
+import pytest
+import rasterio as rio
+from rasterio.coords import BoundingBox
+from rasterio.session import AWSSession
+from rasterio.transform import from_origin
+from shapely.geometry import box
+
+from scripts.links import set_item_self_href
+from scripts.vpp.constants import GDAL_HEADER_ONLY_OPTIONS
+from scripts.vpp.item import create_item, create_item_document, get_item_href, read_metadata_from_s3, read_tile
+from scripts.vpp.tile_grid import GridTile, TileGridCache, get_grid_key
+from scripts.writer import serialize_stac_object
+
+PREFIX = "CLMS/Pan-European/Biophysical/VPP/v01/{year}/s{season}/"
+PARAMETERS = ("AMPL", "EOSD", "EOSV", "LENGTH", "LSLOPE", "MAXD", "MAXV", "MINV", "QFLAG", "RSLOPE", "SOSD", "SOSV")
+GRID_TILES = {
+    "T40KCC": GridTile(
+        BoundingBox(300000.0, 7690240.0, 409800.0, 7800040.0),
+        32740,
+        10980,
+        10980,
+        box(55.077444, -20.877262, 56.13278, -19.8938),
+    ),
+    "T32TNS": GridTile(
+        BoundingBox(499980.0, 5190240.0, 609780.0, 5300040.0),
+        32632,
+        10980,
+        10980,
+        box(8.999737, 46.862457, 10.443867, 47.852738),
+    ),
+}
+
+
+@pytest.mark.parametrize(("tile_id", "year", "season"), [("T40KCC", 2017, 1), ("T32TNS", 2022, 2)])
+def test_create_item_document(tmp_path, tile_id, year, season):
+    """Item documents serialize to the same bytes as the pystac items."""
+    prefix = PREFIX.format(year=year, season=season)
+    objects = [
+        {
+            "Key": f"{prefix}VPP_{year}_S2_{tile_id}-010m_V105_s{season}_{parameter}.tif",
+            "LastModified": datetime(2023, 4, 8, 1, 47, 59, tzinfo=timezone.utc),
+        }
+        for parameter in PARAMETERS
+    ]
+    tile = f"{prefix}VPP_{year}_S2_{tile_id}-010m_V105_s{season}_"
+    with TileGridCache(str(tmp_path / "tile_grid.sqlite")) as tile_grid:
+        tile_grid.add(*get_grid_key(f"VPP_{year}_S2_{tile_id}-010m_s{season}"), GRID_TILES[tile_id])
+        item = create_item(None, "HRVPP", tile, objects=objects, tile_grid=tile_grid)
+        document = create_item_document(*read_tile(None, "HRVPP", tile, objects=objects, tile_grid=tile_grid))
+    set_item_self_href(item, get_item_href(item.id))
+
+    assert document.get_self_href() == item.get_self_href()
+    assert serialize_stac_object(document) == serialize_stac_object(item)
+    assert json.dumps(document.to_dict(include_self_link=False)) == json.dumps(item.to_dict(include_self_link=False))
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves the files of `server.files` by path, like S3 with path-style URLs, recording the requests."""
+
+    def do_GET(self):  # noqa: N802
+        data = self.server.files.get(urlsplit(self.path).path)
+        self.server.requests.append((self.path, self.headers.get("Range")))
+        if data is None:
+            self.send_error(404)
+            return
+        if range_header := self.headers.get("Range"):
+            start, end = (int(value) for value in range_header.removeprefix("bytes=").split("-"))
+            end = min(end, len(data) - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+            data = data[start : end + 1]
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture()
+def s3_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    server.files, server.requests = {}, []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_read_metadata_from_s3_header_only(tmp_path, s3_server, monkeypatch):
+    """Metadata read with the header-only GDAL options matches a full open, and only the header is fetched."""
+    path = str(tmp_path / "tile.tif")
+    with rio.open(
+        path,
+        "w",
+        driver="COG",
+        height=1024,
+        width=1024,
+        count=1,
+        dtype="uint16",
+        crs="EPSG:32740",
+        transform=from_origin(300000, 7800040, 10, 10),
+        compress="NONE",
+    ) as dst:
+        dst.write(np.random.default_rng(0).integers(0, 1000, (1, 1024, 1024), dtype="uint16"))
+    with open(path, "rb") as f:
+        s3_server.files["/HRVPP/tile.tif"] = f.read()
+    envs = []
+    env = rio.Env
+
+    def record_env(*args, **options):
+        envs.append(options)
+        return env(*args, **options)
+
+    monkeypatch.setattr(rio, "Env", record_env)
+    endpoint = f"127.0.0.1:{s3_server.server_port}"
+    client = SimpleNamespace(meta=SimpleNamespace(endpoint_url=f"http://{endpoint}"))
+    session = AWSSession(aws_unsigned=True, endpoint_url=endpoint)
+    last_modified = datetime(2023, 4, 8, 1, 47, 59, tzinfo=timezone.utc)
+
+    metadata = read_metadata_from_s3("HRVPP", "tile.tif", client, session, last_modified)
+
+    with rio.open(path) as tif:
+        assert metadata == (tif.bounds, tif.crs, tif.height, tif.width, last_modified)
+    assert envs == [{"AWS_HTTPS": "NO", **GDAL_HEADER_ONLY_OPTIONS}]
+    # no listing of the prefix, and a single ranged GET of the header instead of the whole file
+    assert s3_server.requests == [
+        ("/HRVPP/tile.tif", f"bytes=0-{GDAL_HEADER_ONLY_OPTIONS['GDAL_INGESTED_BYTES_AT_OPEN'] - 1}")
+    ]
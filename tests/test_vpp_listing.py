@@ -0,0 +1,65 @@
+from scripts.vpp.item import group_tile_objects, list_tile_objects
+
+PREFIX = "CLMS/Pan-European/Biophysical/VPP/v01/2022/s2/"
+KEYS = [
+    f"{PREFIX}VPP_2022_S2_T40KCC-010m_V105_s2_AMPL.tif",
+    f"{PREFIX}VPP_2022_S2_T40KCC-010m_V105_s2_EOSD.tif",
+    f"{PREFIX}VPP_2022_S2_T40KCC-010m_V105_s2_QFLAG.tif.aux.xml",
+    f"{PREFIX}VPP_2022_S2_T40KCD-010m_V105_s2_AMPL.tif",
+    f"{PREFIX}VPP_2022_S2_T40KCD-010m_V105_s2_EOSD.tif",
+    f"{PREFIX}readme.txt",
+    f"{PREFIX}VPP_2022_S2_T40KCE-010m_V105_s2_AMPL.tif",
+]
+
+
+class StubPaginator:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def paginate(self, **kwargs):
+        self.calls.append(kwargs)
+        return iter(self.pages)
+
+
+class StubClient:
+    def __init__(self, pages):
+        self.paginator = StubPaginator(pages)
+
+    def get_paginator(self, operation_name):
+        assert operation_name == "list_objects_v2"
+        return self.paginator
+
+
+def to_objects(keys, etag='"etag"'):
+    return [{"Key": key, "ETag": etag} for key in keys]
+
+
+def test_list_tile_objects():
+    """Objects of a tile split across pages are yielded as one group, and non-GeoTIFFs are skipped."""
+    client = StubClient([{"Contents": to_objects(KEYS[:4])}, {}, {"Contents": to_objects(KEYS[4:])}])
+    tiles = list(list_tile_objects(client, "HRVPP", PREFIX))
+
+    assert client.paginator.calls == [{"Bucket": "HRVPP", "Prefix": PREFIX}]
+    assert [tile for tile, _ in tiles] == [
+        f"{PREFIX}VPP_2022_S2_T40KCC-",
+        f"{PREFIX}VPP_2022_S2_T40KCD-",
+        f"{PREFIX}VPP_2022_S2_T40KCE-",
+    ]
+    assert [[obj["Key"] for obj in objects] for _, objects in tiles] == [KEYS[:2], KEYS[3:5], KEYS[6:]]
+    assert tiles[0][1][0]["ETag"] == "etag"
+
+
+def test_group_tile_objects_matches_listing():
+    """Unordered inventory objects from several prefixes are grouped as listing each prefix would."""
+    other_prefix = PREFIX.replace("/2022/", "/2021/")
+    other_keys = [key.replace(PREFIX, other_prefix).replace("_2022_", "_2021_") for key in KEYS]
+    objects = to_objects([*reversed(KEYS + other_keys), "CLMS/other/VPP_2022_S2_T40KCC-010m_AMPL.tif"], "etag")
+
+    grouped = list(group_tile_objects(objects, [PREFIX, other_prefix]))
+    listed = [
+        tile
+        for prefix, keys in ((other_prefix, other_keys), (PREFIX, KEYS))
+        for tile in list_tile_objects(StubClient([{"Contents": to_objects(keys)}]), "HRVPP", prefix)
+    ]
+    assert grouped == listed
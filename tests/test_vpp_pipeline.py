@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from rasterio.coords import BoundingBox
+from shapely.geometry import box
+
+from scripts.journal import ProgressJournal
+from scripts.validator import get_stac_validator
+from scripts.vpp.pipeline import PipelineConfig, run_pipeline
+from scripts.vpp.tile_grid import GridTile, TileGridCache, get_grid_key
+
+PREFIX = "CLMS/Pan-European/Biophysical/VPP/v01/2022/s2/"
+PARAMETERS = (
+    "AMPL",
+    "EOSD",
+    "EOSV",
+    "LENGTH",
+    "LSLOPE",
+    "MAXD",
+    "MAXV",
+    "MINV",
+    "QFLAG",
+    "RSLOPE",
+    "SOSD",
+    "SOSV",
+    "SPROD",
+    "TPROD",
+)
+LAST_MODIFIED = datetime(2023, 4, 8, 1, 47, 59, tzinfo=timezone.utc)
+GRID_TILE = GridTile(
+    BoundingBox(300000.0, 7690240.0, 409800.0, 7800040.0),
+    32740,
+    10980,
+    10980,
+    box(55.077444, -20.877262, 56.13278, -19.8938),
+)
+
+
+def create_tile(tile_id):
+    tile = f"{PREFIX}VPP_2022_S2_{tile_id}-"
+    objects = [
+        {"Key": f"{tile}010m_V105_s2_{parameter}.tif", "ETag": f'"{tile_id}"', "LastModified": LAST_MODIFIED}
+        for parameter in PARAMETERS
+    ]
+    return tile, objects
+
+
+def run(tiles, tmp_path, writer, client_pool):
+    validator = get_stac_validator("schema/products/vpp.json")
+    with (
+        ProgressJournal(str(tmp_path / "progress.journal")) as journal,
+        TileGridCache(str(tmp_path / "tile_grid.sqlite")) as tile_grid,
+        writer,
+    ):
+        for tile_id in ("T40KCC", "T40KCD"):
+            tile_grid.add(*get_grid_key(f"VPP_2022_S2_{tile_id}-010m_s2"), GRID_TILE)
+        asyncio.run(
+            run_pipeline(
+                client_pool,
+                "HRVPP",
+                validator,
+                [PREFIX],
+                PipelineConfig(
+                    num_workers=2, num_writers=2, tiles=tiles, journal=journal, writer=writer, tile_grid=tile_grid
+                ),
+            )
+        )
+    with ProgressJournal(str(tmp_path / "progress.journal")) as journal:
+        return {
+            tile: journal.is_done(tile, *(objects[0][key] for key in ("ETag", "LastModified")))
+            for tile, objects in tiles
+        }
+
+
+def test_run_pipeline_records_outcomes(tmp_path, memory_writer, stub_client_pool):
+    """Saved tiles are marked done, and tiles that fail to build or save are not."""
+    tiles = [create_tile(tile_id) for tile_id in ("T40KCC", "T40KCD", "T40KCE")]
+    writer = memory_writer(fail_ids=["VPP_2022_S2_T40KCD-010m_s2"])
+
+    done = run(tiles, tmp_path, writer, stub_client_pool)
+
+    assert list(writer.items) == ["VPP_2022_S2_T40KCC-010m_s2"]
+    assert list(done.values()) == [True, False, False]
+
+
+def test_run_pipeline_survives_writer_errors(tmp_path, memory_writer, stub_client_pool):
+    """Items the writer fails to save with any error are recorded as failed, instead of stopping the savers."""
+    tiles = [create_tile(tile_id) for tile_id in ("T40KCC", "T40KCD")]
+    item_ids = ["VPP_2022_S2_T40KCC-010m_s2", "VPP_2022_S2_T40KCD-010m_s2"]
+    writer = memory_writer(fail_ids=item_ids, error=ImportError("Writing zstd compressed files requires zstandard."))
+
+    done = run(tiles, tmp_path, writer, stub_client_pool)
+
+    assert list(writer.items) == []
+    assert list(done.values()) == [False, False]
+
+
+def test_run_pipeline_checks_client_pool_size(stub_client_pool):
+    """A client pool without one client per worker and one for listing is rejected up front."""
+    with pytest.raises(ValueError, match="3 clients, 4 are needed"):
+        asyncio.run(run_pipeline(stub_client_pool, "HRVPP", None, [PREFIX], PipelineConfig(num_workers=3)))
+
+
+def test_run_pipeline_resumes(tmp_path, memory_writer, stub_client_pool):
+    """A second run only builds the tiles that are not done."""
+    tiles = [create_tile(tile_id) for tile_id in ("T40KCC", "T40KCD")]
+    run(tiles, tmp_path, memory_writer(fail_ids=["VPP_2022_S2_T40KCD-010m_s2"]), stub_client_pool)
+    writer = memory_writer()
+
+    done = run(tiles, tmp_path, writer, stub_client_pool)
+
+    assert list(writer.items) == ["VPP_2022_S2_T40KCD-010m_s2"]
+    assert list(done.values()) == [True, True]
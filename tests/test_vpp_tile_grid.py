@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+from rasterio.coords import BoundingBox
+from shapely.geometry import box
+
+from scripts.vpp.item import create_item
+from scripts.vpp.tile_grid import GridTile, TileGridCache, get_grid_key
+
+PREFIX = "CLMS/Pan-European/Biophysical/VPP/v01/2022/s2/"
+LAST_MODIFIED = datetime(2023, 4, 8, 1, 47, 59, tzinfo=timezone.utc)
+GRID_TILE = GridTile(
+    BoundingBox(300000.0, 7690240.0, 409800.0, 7800040.0),
+    32740,
+    10980,
+    10980,
+    box(55.077444, -20.877262, 56.13278, -19.8938),
+)
+
+
+def test_tile_grid_cache(tmp_path):
+    path = str(tmp_path / "tile_grid.sqlite")
+    with TileGridCache(path) as tile_grid:
+        tile_grid.add("T40KCC", "010m", GRID_TILE)
+    with TileGridCache(path) as tile_grid:
+        assert tile_grid.get("T40KCC", "010m") == GRID_TILE
+        assert tile_grid.get("T40KCD", "010m") is None
+
+
+def test_create_item_from_tile_grid(tmp_path):
+    """Items of a tile in the cache are created without reading from S3."""
+    objects = [
+        {"Key": f"{PREFIX}VPP_2023_S2_T40KCC-010m_V105_s1_{parameter}.tif", "LastModified": LAST_MODIFIED}
+        for parameter in ("AMPL", "EOSD")
+    ]
+    with TileGridCache(str(tmp_path / "tile_grid.sqlite")) as tile_grid:
+        tile_grid.add(*get_grid_key("VPP_2022_S2_T40KCC-010m_s2"), GRID_TILE)
+        item = create_item(
+            None, "HRVPP", f"{PREFIX}VPP_2023_S2_T40KCC-010m_V105_s1_", objects=objects, tile_grid=tile_grid
+        )
+    assert item.id == "VPP_2023_S2_T40KCC-010m_s1"
+    assert item.bbox == list(GRID_TILE.geometry.bounds)
+    assert item.properties["proj:epsg"] == 32740
+    assert item.properties["proj:bbox"] == [300000, 7690240, 409800, 7800040]
+    assert item.properties["created"] == "2023-04-08T01:47:59Z"
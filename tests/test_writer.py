@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+import zlib
+from datetime import datetime
+
+import pystac
+import pytest
+
+import scripts.writer
+from scripts.geoparquet import open_ndjson
+from scripts.writer import COMPRESSION_SUFFIXES, ItemWriter, NDJSONWriter, shard_by_year
+
+
+def create_item(item_id: str, root: str) -> pystac.Item:
+    item = pystac.Item(item_id, None, None, datetime(2020, 1, 1), {})
+    item.set_self_href(os.path.join(root, item_id, f"{item_id}.json"))
+    return item
+
+
+def test_item_writer(tmp_path):
+    """Items are written like `save_object` does, with the same permissions and without leaving temporary files."""
+    items = [create_item(f"item-{index}", str(tmp_path / "writer")) for index in range(50)]
+    with ItemWriter(4, max_pending=8) as writer:
+        futures = [writer.submit(item) for item in items]
+    assert [future.result() for future in futures] == [item.get_self_href() for item in items]
+
+    for item in items:
+        expected = create_item(item.id, str(tmp_path / "pystac"))
+        expected.save_object()
+        with open(item.get_self_href(), "rb") as f, open(expected.get_self_href(), "rb") as g:
+            assert f.read().replace(b"/writer/", b"/pystac/") == g.read()
+        assert os.stat(item.get_self_href()).st_mode & 0o777 == os.stat(expected.get_self_href()).st_mode & 0o777
+    assert sorted(os.listdir(tmp_path / "writer" / "item-0")) == ["item-0.json"]
+
+
+def read_lines(path, compression):
+    """Read the lines of a file written so far, whose compressed stream may not be finished."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if compression == "gzip":
+        data = zlib.decompressobj(wbits=31).decompress(data)
+    elif compression == "zstd":
+        data = pytest.importorskip("zstandard").ZstdDecompressor().decompressobj().decompress(data)
+    return data.splitlines()
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_ndjson_writer(tmp_path, compression):
+    """Items are written to one file per shard and run, in submission order, and readable once their write is done."""
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    items = [create_item(f"item-{index}", str(tmp_path)) for index in range(10)]
+    for index, item in enumerate(items):
+        item.datetime = datetime(2020 + index % 2, 1, 1)
+    for run_id, run in (("1", items[:6]), ("2", items[6:])):
+        with NDJSONWriter(
+            str(tmp_path), "items", shard_by=shard_by_year, compression=compression, run_id=run_id
+        ) as writer:
+            path = writer.submit(run[0]).result()
+            assert [json.loads(line)["id"] for line in read_lines(path, compression)] == [run[0].id]
+            for item in run[1:]:
+                writer.submit(item)
+
+        for year in (2020, 2021):
+            path = writer.get_path(str(year))
+            assert path.endswith(f"items-{year}-{run_id}.ndjson{COMPRESSION_SUFFIXES[compression]}")
+            with open_ndjson(path) as f:
+                lines = f.read().splitlines()
+            assert [json.loads(line)["id"] for line in lines] == [item.id for item in run if item.datetime.year == year]
+
+
+def test_ndjson_writer_syncs_in_batches(tmp_path, monkeypatch):
+    """Queued items are synced every `sync_every` items, and their futures only resolve once they are."""
+    synced = []
+    monkeypatch.setattr(scripts.writer.os, "fsync", lambda fd: synced.append(fd))
+    items = [create_item(f"item-{index}", str(tmp_path)) for index in range(10)]
+    queued = threading.Event()
+
+    def shard_by(_item):
+        # holds the writer thread until every item is queued
+        queued.wait()
+        return "all"
+
+    with NDJSONWriter(str(tmp_path), "items", shard_by, max_pending=10, run_id="1", sync_every=4) as writer:
+        futures = [writer.submit(item) for item in items]
+        queued.set()
+        results = [future.result() for future in futures]
+    assert results == [writer.get_path("all")] * 10
+    assert len(synced) == 3